@@ -1,4 +1,6 @@
 from .regex import *
+from .intervals import *
+from .suffix_automaton import *
 from .concordancer import *
 from .tfidf import *
 from .ngram import *
@@ -2,8 +2,9 @@ import numpy as np
 import pandas as pd
 import math
 import random
+from ..extraction.store import count_store_rows_by_file
 
-def retrieve_bootstrap_data(df,current_entity,df_metrics_locations):
+def retrieve_bootstrap_data(df,current_entity,df_metrics_locations,store):
     """
     Retrieve the number of TP, FP and FN present in each file.
     
@@ -11,6 +12,7 @@ def retrieve_bootstrap_data(df,current_entity,df_metrics_locations):
     df (dataframe) : Dataframe containing the annotated words, their occurrences, places and related entity.
     current_entity (str) : current working entity selected.  
     df_metrics_locations (dataframe) : contains the locations of each categorized word, and whether they are true positive, false positive or false negative.
+    store (dict) : the annotation store, where the places of the annotations are read.
     
     Return :
     (dict) : dictionnary containing each file and their associated TP, FP and FN. 
@@ -24,14 +26,14 @@ def retrieve_bootstrap_data(df,current_entity,df_metrics_locations):
         bootstrap_data[file]={'TP': (TP+TPcorr),'FP': FP,'FN': 0}
         
     #Retrieve of FN
-    for index, row in df.iterrows():
-        if "category?" in row['category']:
-            for place in row['places']:
-                file = place[0]+".txt"
-                if file in bootstrap_data:
-                    bootstrap_data[file]['FN'] += 1
-                else : 
-                    bootstrap_data[file]={'TP': 0,'FP': 0,'FN': 1}
+    uncategorized = df[df['category'].str.contains("category?",regex=False)]
+    if len(uncategorized):
+        rows = np.concatenate(uncategorized['places'].tolist())
+        for file, FN in count_store_rows_by_file(store,rows).items():
+            if file in bootstrap_data:
+                bootstrap_data[file]['FN'] += FN
+            else : 
+                bootstrap_data[file]={'TP': 0,'FP': 0,'FN': FN}
                     
     return bootstrap_data
 
@@ -55,7 +57,7 @@ def calculate_metrics(TP, FP, FN):
     return precision, recall, f1
 
 
-def estimate_confidence_intervals_bootstrap(df,current_entity,df_metrics_locations,draw_number=1000, alpha=5.0):
+def estimate_confidence_intervals_bootstrap(df,current_entity,df_metrics_locations,store,draw_number=1000, alpha=5.0):
     """
     Calculate the confidence intervals for each entity's metrics (precision and recall) by bootstrapping on the files. 
     
@@ -63,6 +65,7 @@ def estimate_confidence_intervals_bootstrap(df,current_entity,df_metrics_locatio
     df (dataframe) : Dataframe containing the annotated words, their occurrences, places and related entity.
     current_entity (str) : current working entity selected.  
     df_metrics_locations (dataframe) : contains the locations of each categorized word, and whether they are true positive, false positive or false negative.
+    store (dict) : the annotation store, where the places of the annotations are read.
     draw_number (int) : number of times that we draw files. 
     alpha (int) : represents the percentage of the distribution that falls outside the confidence interval, with a default value of 5.0
     
@@ -70,7 +73,7 @@ def estimate_confidence_intervals_bootstrap(df,current_entity,df_metrics_locatio
     bootstrap_results (dict) : dictionnary of the confidence intervals of the metrics (precision and recall) calculated by bootstrap 
     """ 
     
-    bootstrap_data = retrieve_bootstrap_data(df,current_entity,df_metrics_locations)
+    bootstrap_data = retrieve_bootstrap_data(df,current_entity,df_metrics_locations,store)
     files = list(bootstrap_data.keys())
     precisions = []
     recalls = []
@@ -2,66 +2,124 @@ import os
 import re
 import pandas as pd
 from ipydatagrid import DataGrid, TextRenderer, Expr
+from .intervals import build_interval_index, find_containing
+from ..extraction.corpus import iter_corpus_texts, get_corpus_text
+from ..extraction.token_index import is_literal_pattern, search_token_index
 
-def get_annotations(docs):
+def get_annotation_entity(store,file_name,place_start,place_end):
     """
-    Retrieve the annotations from the different files.
+    Retrieve the entity of the first annotation of a file containing the given place.
     
     Parameters : 
-    docs (generator) : contains all the informations extracted from the .ann files. 
+    store (dict) : the annotation store. 
+    file_name (string) : name of the .txt file.
+    place_start (int) : beginning of the place in the text.
+    place_end (int) : end of the place in the text.
     
     Return :
-    (list) : contains the informations related to each annotation (text, place, document,entity). 
+    (string) : the entity of the annotation, None if the place is not annotated. 
     """
-    annotations=[]
-    for doc in docs : 
-        for ent in doc['entities']:
-            annotations.append((doc['num_ann']+".txt",ent['label'],ent['text'],ent['fragments'][0]['begin'],ent['fragments'][0]['end']))
-    return annotations
+    if 'interval_index' not in store:
+        places = zip(store['doc_id'].tolist(),store['begin'].tolist(),store['end'].tolist())
+        store['interval_index'] = build_interval_index((store['docs'][doc_id]+".txt",begin,end,row) for row,(doc_id,begin,end) in enumerate(places))
+    annotation = find_containing(store['interval_index'],file_name,place_start,place_end)
+    if annotation is None:
+        return None
+    return store['labels'][store['label_id'][annotation[3]]]
+
+CONCORDANCER_PAGE_SIZE = 100
+CONTEXT_BEFORE = 70
+CONTEXT_AFTER = 60
 
 def get_matches(path,pattern):
     """
     Check the occurrences of a pattern in all the .txt files from the given path.
+    Plain words and phrases beginning with a non-word character are found from the token index of the corpus (built at the first search),
+    other patterns are searched as regular expressions in each text.
     
     Parameters : 
     path (string) : path of the current working directory.
     pattern (string) : word(s) that are searched in the texts.
     
     Return :
-    (list) : contains the sentences in which the pattern is present, as well as the filename and the place in the text. 
+    (list) : contains the filename and the place in the text of each occurrence of the pattern. 
     """
-    matches=[]
-    for file_name in os.listdir(path):
-        if file_name.endswith(".txt"):
-            with open(os.path.join(path, file_name), 'r', newline='',encoding='utf-8') as file:
-                text = file.read().lower()
-                for match in re.finditer(pattern, text):
-                    place_start = match.start()
-                    place_end = match.end()
-                    sentence = "..."+text[match.start()-70:match.end()+60]+"..."
-                    matches.append((pattern,sentence,file_name,place_start,place_end))
-    return matches
+    if is_literal_pattern(pattern):
+        return search_token_index(path,pattern)
+    return [(file_name,match.start(),match.end()) for file_name, text in iter_corpus_texts(path) for match in re.finditer(pattern, text)]
 
-def cut_sentence(word,sentence):
+def get_context(text,place_start,place_end):
     """
-    Split the sentence in 3 parts, before and after the word of interest.
+    Split the text around an occurrence in 3 parts, from the place of the occurrence.
     
     Parameters : 
-    word (string) : word where the sentence needs to be split.
-    sentence (string) : sentence to split in 3 parts.
+    text (string) : lowercased text of the file containing the occurrence.
+    place_start (int) : beginning of the occurrence in the text.
+    place_end (int) : end of the occurrence in the text.
     
     Return :
-    (strings) : the text before the word of interest, the word of interest, and the text after the word of interest. 
+    (strings) : the text before the occurrence, the occurrence, and the text after the occurrence. 
     """
-    cut=sentence.lower().split(word)
-    words_before = cut[0][-70:].rjust(70)
-    if len(cut[0]) > 70:
+    words_before = text[max(place_start-CONTEXT_BEFORE,0):place_start].rjust(CONTEXT_BEFORE)
+    if place_start > CONTEXT_BEFORE:
         words_before = "..."+words_before
-    try : 
-        words_after = cut[1].strip()
-    except IndexError:
-        words_after=""
-    return words_before,word,words_after
+    words_after = text[place_end:place_end+CONTEXT_AFTER].strip()
+    if place_end+CONTEXT_AFTER < len(text):
+        words_after = words_after+"..."
+    return words_before,text[place_start:place_end],words_after
+
+def create_concordancer_results(pattern,path,store,page_size=CONCORDANCER_PAGE_SIZE):
+    """
+    Search the occurrences of a pattern in the corpus, without building their contexts : 
+    the contexts and the annotations of the occurrences are only retrieved for the page displayed (see "get_concordancer_page").
+    
+    Parameters : 
+    pattern (string) : word(s) that are searched in the texts.
+    path (string) : path of the current working directory.
+    store (dict) : the annotation store. 
+    page_size (int) : number of occurrences displayed in a page.
+    
+    Return :
+    (dict) : the concordancer results, with the keys 'pattern', 'path', 'store', 'matches' (places of the occurrences), 'total' and 'page_size'.
+    """
+    matches = get_matches(path,pattern)
+    return {'pattern':pattern,'path':path,'store':store,'matches':matches,'total':len(matches),'page_size':page_size}
+
+def get_concordancer_pages_number(results):
+    """
+    Return the number of pages of the concordancer results (at least one, even without occurrence).
+    
+    Parameters : 
+    results (dict) : the concordancer results.
+    
+    Return :
+    (int) : the number of pages.
+    """
+    return max(1,-(-results['total']//results['page_size']))
+
+def get_concordancer_page(results,page):
+    """
+    Build the rows of a page of the concordancer results : the contexts of the occurrences and their annotations.
+    
+    Parameters : 
+    results (dict) : the concordancer results.
+    page (int) : number of the page, starting from 0.
+    
+    Return :
+    (dataframe) : contexts and entity of the occurrences of the page.
+    """
+    first = page*results['page_size']
+    res_concordancier=[]
+    text_file_name, text = None, None
+    for file_name, place_start, place_end in results['matches'][first:first+results['page_size']]:
+        if file_name != text_file_name:
+            text_file_name, text = file_name, get_corpus_text(results['path'],file_name)
+        words_before, word, words_after = get_context(text,place_start,place_end)
+        entity = get_annotation_entity(results['store'],file_name,place_start,place_end)
+        if entity is None:
+            entity = "Not annotated"
+        res_concordancier.append((words_before,word,words_after,entity))
+    return pd.DataFrame(res_concordancier,columns=['words before','word','words after','entity'])
 
 def background_color_concordancer(cell):
     if cell.value != "Not annotated":
@@ -69,40 +127,18 @@ def background_color_concordancer(cell):
     else:
         return "#db8519"
 
-def calculate_concordancer(pattern,current_entity,path,docs):
+def calculate_concordancer(results,page=0):
     """
-    Creates a concordancer (datagrid) where the occurrences of a word in the text files are searched, and check if these occurrences corresponds to existing annotations.
+    Creates a concordancer (datagrid) displaying a page of the occurrences of a word in the text files, and checking if these occurrences corresponds to existing annotations.
     
     Parameters : 
-    pattern (string) : word(s) that are searched in the texts.
-    current_entity (string) : the current selected entity.
-    path (string) : path of the current working directory.
-    docs (generator) : contains all the informations extracted from the .ann files. 
+    results (dict) : the concordancer results, see "create_concordancer_results".
+    page (int) : number of the page displayed, starting from 0.
     
     Return :
     (datagrid) : datagrid containing the result of the concordancer.
     """
-        
-    matches=get_matches(path,pattern)
-    annotations=get_annotations(docs)
-
-    res_concordancier=[]
-    for match in matches : 
-        res=cut_sentence(match[0],match[1])
-        in_no_annotation = True
-        for annotation in annotations : 
-            if match[2]==annotation[0]:
-                if annotation[3]<=match[3] and match[4]<=annotation[4]: 
-                    if annotation[1].lower()==current_entity: 
-                        res_concordancier.append((res[0],res[1],res[2],current_entity))
-                    else : 
-                        res_concordancier.append((res[0],res[1],res[2],annotation[1]))
-                    in_no_annotation = False
-                    break
-        if in_no_annotation:
-            res_concordancier.append((res[0],res[1],res[2],"Not annotated"))
-    
-    dg_res_concordancer = DataGrid(pd.DataFrame(res_concordancier,columns=['words before','word','words after','entity']),
+    dg_res_concordancer = DataGrid(get_concordancer_page(results,page),
                                   layout={"height":"350px","width":"1165px"},base_row_size=25,
                                   column_widths={"words before":440,"word":110,"words after":380,"entity":150})
     renderers = {
@@ -113,4 +149,4 @@ def calculate_concordancer(pattern,current_entity,path,docs):
     
     dg_res_concordancer.renderers= renderers
     
-    return dg_res_concordancer
\ No newline at end of file
+    return dg_res_concordancer
@@ -0,0 +1,153 @@
+from bisect import bisect_left, bisect_right
+
+def create_interval_index():
+    """
+    Create an empty interval index. For each file, the intervals are grouped by length (each group holding the intervals whose length
+    has the same number of bits) and sorted by their beginning, so that the intervals containing or overlapping a place are found
+    by binary search instead of scanning all the intervals of the file. Grouping by length bounds the part of each group scanned by a query,
+    so that a few very long intervals do not slow down the queries on the others.
+
+    Return :
+    (dict) : the empty interval index.
+    """
+    return {'files': {}, 'count': 0}
+
+def get_length_group(begin, end):
+    """
+    Return the group of the intervals of the same length class as [begin, end], see "create_interval_index".
+
+    Parameters :
+    begin (int) : beginning of the interval.
+    end (int) : end of the interval.
+
+    Return :
+    (int) : the group of the interval.
+    """
+    return max(end - begin, 0).bit_length()
+
+def add_interval(index, file_name, begin, end, item=None):
+    """
+    Add an interval to the index. To build an index from many intervals, "build_interval_index" sorts them once instead.
+
+    Parameters :
+    index (dict) : the interval index.
+    file_name (string) : file of the interval.
+    begin (int) : beginning of the interval.
+    end (int) : end of the interval.
+    item (object) : value associated with the interval, returned by the queries.
+    """
+    groups = index['files'].setdefault(file_name, {})
+    intervals = groups.setdefault(get_length_group(begin, end), {'begins': [], 'entries': [], 'max_length': 0})
+    position = bisect_right(intervals['begins'], begin)
+    intervals['begins'].insert(position, begin)
+    # entry : [begin, end, insertion order, item, removed]
+    intervals['entries'].insert(position, [begin, end, index['count'], item, False])
+    intervals['max_length'] = max(intervals['max_length'], end - begin)
+    index['count'] += 1
+
+def build_interval_index(intervals):
+    """
+    Build an interval index from a list of intervals, sorting the intervals of each file and length group once.
+
+    Parameters :
+    intervals (iterable) : (file name, begin, end, item) of each interval.
+
+    Return :
+    (dict) : the interval index.
+    """
+    index = create_interval_index()
+    for file_name, begin, end, item in intervals:
+        groups = index['files'].setdefault(file_name, {})
+        group = groups.setdefault(get_length_group(begin, end), {'begins': [], 'entries': [], 'max_length': 0})
+        group['entries'].append([begin, end, index['count'], item, False])
+        index['count'] += 1
+    for groups in index['files'].values():
+        for group in groups.values():
+            # the sort is stable : the intervals beginning at the same place stay in insertion order, as with "add_interval"
+            group['entries'].sort(key=lambda entry: entry[0])
+            group['begins'] = [entry[0] for entry in group['entries']]
+            group['max_length'] = max(entry[1] - entry[0] for entry in group['entries'])
+    return index
+
+def find_containing(index, file_name, start, end, accept=None):
+    """
+    Find the first interval (in insertion order) of a file containing the place [start, end].
+
+    Parameters :
+    index (dict) : the interval index.
+    file_name (string) : file of the place.
+    start (int) : beginning of the place.
+    end (int) : end of the place.
+    accept (function) : optional filter on the entries [begin, end, insertion order, item, removed] of the candidate intervals.
+
+    Return :
+    (list) : the entry [begin, end, insertion order, item, removed] of the interval, None if no interval contains the place.
+    """
+    groups = index['files'].get(file_name)
+    if groups is None:
+        return None
+    found = None
+    for intervals in groups.values():
+        if intervals['max_length'] < end - start:
+            continue
+        begins = intervals['begins']
+        # An interval containing the place begins at most at 'start', and at least 'max_length' before 'end'
+        low = bisect_left(begins, end - intervals['max_length'])
+        high = bisect_right(begins, start)
+        for entry in intervals['entries'][low:high]:
+            if entry[4] or entry[1] < end:
+                continue
+            if found is not None and entry[2] > found[2]:
+                continue
+            if accept is None or accept(entry):
+                found = entry
+    return found
+
+def find_overlapping(index, file_name, start, end):
+    """
+    Find all the intervals of a file overlapping the place [start, end], in insertion order.
+
+    Parameters :
+    index (dict) : the interval index.
+    file_name (string) : file of the place.
+    start (int) : beginning of the place.
+    end (int) : end of the place.
+
+    Return :
+    (list) : the entries [begin, end, insertion order, item, removed] of the intervals.
+    """
+    groups = index['files'].get(file_name)
+    if groups is None:
+        return []
+    found = []
+    for intervals in groups.values():
+        begins = intervals['begins']
+        low = bisect_left(begins, start - intervals['max_length'])
+        high = bisect_left(begins, end)
+        found.extend(entry for entry in intervals['entries'][low:high] if not entry[4] and entry[1] > start)
+    return sorted(found, key=lambda entry: entry[2])
+
+def remove_interval(entry):
+    """
+    Remove an interval, found by a query, from the index.
+
+    Parameters :
+    entry (list) : the entry [begin, end, insertion order, item, removed] of the interval.
+    """
+    entry[4] = True
+
+def get_intervals(index, file_name):
+    """
+    Return the intervals of a file that were not removed, in insertion order.
+
+    Parameters :
+    index (dict) : the interval index.
+    file_name (string) : file of the intervals.
+
+    Return :
+    (list) : the entries [begin, end, insertion order, item, removed] of the intervals.
+    """
+    groups = index['files'].get(file_name)
+    if groups is None:
+        return []
+    return sorted((entry for intervals in groups.values() for entry in intervals['entries'] if not entry[4]), key=lambda entry: entry[2])
@@ -3,123 +3,299 @@ import re
 import pandas as pd
 from ipydatagrid import DataGrid, TextRenderer, BarRenderer, Expr, VegaExpr,CellRenderer
 from bqplot import LinearScale, ColorScale, OrdinalColorScale, OrdinalScale
-from unidecode import unidecode
 from .regex import *
+from .intervals import *
+from .suffix_automaton import *
+from ..extraction.store import get_store_places
+from ..extraction.corpus import get_corpus_store, get_corpus_files, get_corpus_text
+from ..extraction.decisions import has_decision
 import numpy as np
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
-def calculate_location_metrics(current_entity,ent_cat,path,df,other_categories,list_isNotFP,list_isNotFN,ban_words_entities):
+METRICS_MIN_FILES_PER_TASK = 16
+METRICS_CONTEXT_LENGTH = 70
+
+# Pool of worker processes kept between the metrics calculations, see "get_metrics_executor"
+metrics_executor = {'executor': None, 'workers': 0, 'corpus': None}
+
+def calculate_document_metrics(file_name,text,categories,banwords,list_isNotFP,list_isNotFN):
     """
-    Retrieves and sorts words from annotated texts into matching categories, then compares whether these words match any of the existing annotations. 
+    Find the locations of all the categories of the current entity in a document, and whether they are true positive, false positive or false negative.
+    The document is read once for all the categories.
+    
+    Parameters : 
+    file_name (string) : name of the .txt file.
+    text (string) : lowercased text of the file.
+    categories (list) : for each category, the dictionnary of its 'cat_striped' (category without brackets), 'pattern' (compiled regex), 
+                        'locations' (interval index of the annotations of the category) and 'other_locations' (interval index of the annotations that could belong to the category).
+    banwords (list) : banwords of the current entity.
+    list_isNotFP (dict) : index of the FP considered as TP, see "add_decision".
+    list_isNotFN (dict) : index of the FN disregarded, see "add_decision".
+    
+    Return :
+    (list) : for each category, the list of its locations in the document. 
+    """
+    not_banned = lambda location: not any(banword in text[location[0]:location[1]] for banword in banwords)
+    documents_metrics = []
+    for category in categories:
+        document_metrics = []
+        cat_striped = category['cat_striped']
+        locations = category['locations']
+        other_locations = category['other_locations']
+        locations_found_currentfile = create_interval_index()
+        for match in re.finditer(category['pattern'], text):
+            place_start = match.start()
+            place_end = match.end()
+            motif = text[place_start:match.end()]
+            long_motif = "..."+text[max(place_start-METRICS_CONTEXT_LENGTH,0):min(place_end+METRICS_CONTEXT_LENGTH,len(text))]+"..."
+            location = find_containing(locations,file_name,place_start,place_end,accept=not_banned)
+            if location is not None: #place found (TP)
+                annotation=location[3]
+                remove_interval(location)
+                add_interval(locations_found_currentfile,file_name,location[0],location[1])
+                document_metrics.append([cat_striped,"TP",False,False,long_motif,file_name,[place_start,place_end],annotation,motif])
+        
+            else : #verification in other categories, if exist we add in 'FP'
+                add_to_FP = True   
+                if any(banword in long_motif for banword in banwords):
+                    add_to_FP = False
+                    continue
+                if find_containing(locations_found_currentfile,file_name,place_start,place_end) is not None: #verification in already exist to current category
+                    add_to_FP = False
+                if find_containing(other_locations,file_name,place_start,place_end) is not None: #verification in other categories
+                    add_to_FP = False
+                   
+                if add_to_FP : #location not found (FP)
+                    if has_decision(list_isNotFP,cat_striped,file_name,[place_start,place_end],motif) :  
+                        document_metrics.append([cat_striped,"TP(corr)",True,False,long_motif,file_name,[place_start,place_end],'no annotation',motif]) 
+                    else : 
+                        document_metrics.append([cat_striped,"FP",False,False,long_motif,file_name,[place_start,place_end],'no annotation',motif]) 
+                
+        locations_left = [[location[0],location[1],location[3]] for location in get_intervals(locations,file_name)]
+        if len(locations_left)!=0: #locations left (FN)                
+            for place in locations_left:
+                # cut from the text itself, as the TP and FP, so that the place of the annotation in the context is given by "get_context_places"
+                long_motif = "..."+text[max(place[0]-METRICS_CONTEXT_LENGTH,0):min(place[1]+METRICS_CONTEXT_LENGTH,len(text))]+"..."
+                if has_decision(list_isNotFN,cat_striped,file_name,[place[0],place[1]],place[2]) :
+                    document_metrics.append([cat_striped,"Discarded",False,True,long_motif,file_name,[place[0],place[1]],place[2],'no motif']) 
+                else :         
+                    document_metrics.append([cat_striped,"FN",False,False,long_motif,file_name,[place[0],place[1]],place[2],'no motif']) 
+        documents_metrics.append(document_metrics)
+    return documents_metrics
+
+def calculate_files_metrics(path,file_names,entities_categories,entities_banwords,list_isNotFP,list_isNotFN):
+    """
+    Find the locations of the categories of several entities in several documents of the corpus, see "calculate_document_metrics". 
+    Each document is read once for all the entities. Called by the worker processes, which read the texts from the corpus store.
     
     Parameters : 
-    current_entity (string) : the current selected entity.
-    ent_cat (dict) : List of all the entities paired with their categories.
     path (string) : path of the current working directory.
-    df (dataframe) : Dataframe containing the annotated words, their occurrences, places and related entity.
-    other_categories (list) : contains all the annotations of the current entity that could belong to another category. 
+    file_names (list) : names of the .txt files.
+    entities_categories (list) : for each entity, its categories, see "calculate_document_metrics".
+    entities_banwords (list) : for each entity, its banwords.
+    list_isNotFP (dict) : index of the FP considered as TP, see "add_decision".
+    list_isNotFN (dict) : index of the FN disregarded, see "add_decision".
     
     Return :
-    (dict) : dictionnary containing the locations of each categorized word, and whether they are true positive, false positive or false negative. 
+    (list) : for each document, for each entity, the list of the locations of each category in the document.
+    """
+    files_metrics = []
+    for file_name in file_names:
+        text = get_corpus_text(path, file_name)
+        files_metrics.append([calculate_document_metrics(file_name,text,categories,banwords,list_isNotFP,list_isNotFN) for categories, banwords in zip(entities_categories,entities_banwords)])
+    return files_metrics
+
+def split_metrics_task(file_names,entities_categories,list_isNotFP,list_isNotFN):
     """
+    Restrict the categories and the reviewer decisions to some documents, so that only their locations are sent to a worker process.
     
-    location_metrics={}
-    location_metrics[current_entity] = []
-    locations = {}
-    locations_found_currentfile = []
+    Parameters : 
+    file_names (list) : names of the .txt files.
+    entities_categories (list) : for each entity, its categories, see "calculate_document_metrics".
+    list_isNotFP (dict) : index of the FP considered as TP, see "add_decision".
+    list_isNotFN (dict) : index of the FN disregarded, see "add_decision".
     
-    txt_files = []
-    for file_name in os.listdir(path):
-        if file_name.endswith(".txt"):
-            txt_files.append(file_name)
-            locations[file_name]=[]
+    Return :
+    (tuple) : the categories of each entity, the FP and the FN decisions of the documents.
+    """
+    files = set(file_names)
+    restrict = lambda index: {'files': {file_name: index['files'][file_name] for file_name in file_names if file_name in index['files']}, 'count': index['count']}
+    task_categories = [[dict(category, locations=restrict(category['locations']), other_locations=restrict(category['other_locations'])) for category in categories] for categories in entities_categories]
+    task_isNotFP = {key: value for key, value in list_isNotFP.items() if key[1] in files}
+    task_isNotFN = {key: value for key, value in list_isNotFN.items() if key[1] in files}
+    return task_categories, task_isNotFP, task_isNotFN
+
+def get_metrics_executor(path,workers):
+    """
+    Return the pool of worker processes checking the documents. The pool is created once and reused by the next calculations,
+    instead of starting new processes at each refresh of the interface. It is only created again if more workers are needed, 
+    or if the corpus store changed, the workers reading the texts from the store opened when they started.
     
-    # 1 -  storage of places of each annotations categorised in "locations"
-    ent_cat2 = [cat for cat in ent_cat[current_entity] if cat != "category?"]
+    Parameters : 
+    path (string) : path of the current working directory.
+    workers (int) : number of worker processes needed.
+    
+    Return :
+    (ProcessPoolExecutor) : the pool of worker processes.
+    """
+    corpus = (os.path.abspath(path), get_corpus_store(path)['signatures'])
+    if metrics_executor['executor'] is None or metrics_executor['workers'] < workers or metrics_executor['corpus'] != corpus:
+        close_metrics_executor()
+        metrics_executor['executor'] = ProcessPoolExecutor(max_workers=workers)
+        metrics_executor['workers'] = workers
+        metrics_executor['corpus'] = corpus
+    return metrics_executor['executor']
+
+def close_metrics_executor():
+    """
+    Stop the pool of worker processes checking the documents, if it was created.
+    """
+    if metrics_executor['executor'] is not None:
+        metrics_executor['executor'].shutdown(cancel_futures=True)
+    metrics_executor['executor'] = None
+    metrics_executor['workers'] = 0
+    metrics_executor['corpus'] = None
+
+def iter_documents_metrics(path,txt_files,entities_categories,entities_banwords,list_isNotFP,list_isNotFN,workers=None):
+    """
+    Iterate over the locations of the categories of several entities in each document, in the order of the documents.
+    With several workers, the documents are split in consecutive tasks sent to a pool of processes, and the results 
+    are read back in the order of the tasks, so that they are the same as the sequential ones.
+    
+    Parameters : 
+    path (string) : path of the current working directory.
+    txt_files (list) : names of the .txt files.
+    entities_categories (list) : for each entity, its categories, see "calculate_document_metrics".
+    entities_banwords (list) : for each entity, its banwords.
+    list_isNotFP (dict) : index of the FP considered as TP, see "add_decision".
+    list_isNotFN (dict) : index of the FN disregarded, see "add_decision".
+    workers (int) : maximal number of worker processes, None to check the documents sequentially. No more workers than tasks are used, see "get_metrics_executor".
+    
+    Return :
+    (generator) : for each document, for each entity, the list of the locations of each category in the document.
+    """
+    task_size = max(METRICS_MIN_FILES_PER_TASK, -(-len(txt_files) // ((workers or 1) * 4)))
+    if not workers or workers <= 1 or len(txt_files) <= task_size:
+        for file_name in txt_files:
+            yield from calculate_files_metrics(path,[file_name],entities_categories,entities_banwords,list_isNotFP,list_isNotFN)
+        return
+    
+    tasks_number = -(-len(txt_files) // task_size)
+    executor = get_metrics_executor(path,min(workers,tasks_number))
+    try:
+        futures = []
+        for first in range(0, len(txt_files), task_size):
+            file_names = txt_files[first:first + task_size]
+            task_categories, task_isNotFP, task_isNotFN = split_metrics_task(file_names,entities_categories,list_isNotFP,list_isNotFN)
+            futures.append(executor.submit(calculate_files_metrics,path,file_names,task_categories,entities_banwords,task_isNotFP,task_isNotFN))
+        for future in futures:
+            yield from future.result()
+    except BrokenProcessPool:
+        close_metrics_executor()
+        raise
+
+def create_entity_categories(entity,ent_cat,df,other_categories,store,txt_files_set):
+    """
+    Create the categories of an entity searched in the documents : their regex, the places of the annotations categorised in each of them 
+    and the places of the annotations that could belong to them.
+    
+    Parameters : 
+    entity (string) : the entity.
+    ent_cat (dict) : List of all the entities paired with their categories.
+    df (dataframe) : Dataframe containing the annotated words, their occurrences, places and related entity.
+    other_categories (dataframe) : table of the annotations that could belong to another category, see "build_other_categories". 
+    store (dict) : the annotation store, where the places of the annotations are read.
+    txt_files_set (set) : names of the .txt files of the corpus.
+    
+    Return :
+    (list) : the categories, see "calculate_document_metrics".
+    """
+    other_categories = other_categories[other_categories['entity'] == entity]
+    ent_cat2 = [cat for cat in ent_cat[entity] if cat not in ("category?", "[]")] #'[]' : empty category being written
+    categories = []
     for cat in ent_cat2:
-        cat_striped=cat.strip("[]")
         #cat sans parenthèse
-        filtre = (df['entity'] == current_entity) & (df['category'] == cat)
-        for index, row in df[filtre].iterrows():
-            for place in row['places']:
-                name_document = place[0]+".txt"
-                place_document = [place[1],place[2],row['text']]
-                if name_document in locations:
-                    locations[name_document].append(place_document)
-    
-        # 2 - Verification by category : TP,FP and FN
-        pattern, list_spacing_pattern = generate_regex(eval(cat))
-        for file_name in txt_files:
-            locations_found_currentfile=[]
-            with open(os.path.join(path, file_name), 'r', newline='',encoding='utf-8') as file:
-                text = file.read().lower()
-                #text_decode = unidecode(text)
-                for match in re.finditer(pattern, text):
-                    place_start = match.start()
-                    place_end = match.end()
-                    motif = text[place_start:match.end()]
-                    long_motif = "..."+text[max(place_start-70,0):min(place_end+70,len(text))]+"..."
-                    FP = True   
-                    for location in locations[file_name]: 
-                        if location[0]<=place_start and place_end <= location[1]: #place found (TP)
-                            if any(banword in text[location[0]:location[1]] for banword in ban_words_entities[current_entity] if banword!="None"):
-                                continue
-                            annotation=location[2]
-                            locations[file_name].remove(location)
-                            locations_found_currentfile.append(location)
-                            location_metrics[current_entity].append([cat_striped,"TP",False,False,long_motif,file_name,[place_start,place_end],annotation,motif])
-                            FP = False 
-                            break
-                
-                    if FP : #verification in other categories, if exist we add in 'FP'
-                        df_other_categories = pd.DataFrame(other_categories,columns=["entity", "category","text","file", "places"])
-                        filtre2 = (df_other_categories['entity'] == current_entity) & (df_other_categories['category'] == cat) & (df_other_categories['file'] == file_name)
-                        add_to_FP = True   
-                        if any(banword in long_motif for banword in ban_words_entities[current_entity] if banword!="None"):
-                            add_to_FP = False
-                            continue
-                        for location in locations_found_currentfile : #verification in already exist to current category
-                            if location[0]<=place_start and place_end <= location[1]:
-                                add_to_FP = False
-                        
-                        for index, row in df_other_categories[filtre2].iterrows(): #verification in other categories
-                            if row['places'][0]<=place_start and place_end <= row['places'][1]:
-                                add_to_FP = False
-                                break
-                           
-                        if add_to_FP : #location not found (FP)
-                            is_notFP = False
-                            for v in list_isNotFP : 
-                                if [cat_striped,"TP(corr)",True,False,long_motif,file_name,[place_start,place_end],'no annotation',motif] == v :
-                                    is_notFP = True
-                                    break
-                            if is_notFP :  
-                                location_metrics[current_entity].append([cat_striped,"TP(corr)",True,False,long_motif,file_name,[place_start,place_end],'no annotation',motif]) 
-                            else : 
-                                location_metrics[current_entity].append([cat_striped,"FP",False,False,long_motif,file_name,[place_start,place_end],'no annotation',motif]) 
-                        
-            if len(locations[file_name])!=0: #locations left (FN)                
-                with open(os.path.join(path, file_name), 'r', newline='',encoding='utf-8') as file:
-                    text = file.read().lower()
-                    text = unidecode(text)
-                    for place in locations[file_name]:
-                        long_motif = "..."+text[max(place[0]-70,0):min(place[1]+70,len(text))]+"..."
-                        is_notFN = False
-                        for v in list_isNotFN :
-                            if [cat_striped,"Discarded",False,True,long_motif,file_name,[place[0],place[1]],place[2],'no motif'] == v :
-                                is_notFN = True
-                                break
-                        if is_notFN :
-                            location_metrics[current_entity].append([cat_striped,"Discarded",False,True,long_motif,file_name,[place[0],place[1]],place[2],'no motif']) 
-                        else :         
-                            location_metrics[current_entity].append([cat_striped,"FN",False,False,long_motif,file_name,[place[0],place[1]],place[2],'no motif']) 
-                    locations[file_name]=[] 
+        filtre = (df['entity'] == entity) & (df['category'] == cat)
+        locations = build_interval_index((place[0]+".txt",place[1],place[2],row['text']) for index, row in df[filtre].iterrows()
+                                         for place in get_store_places(store,row['places']) if place[0]+".txt" in txt_files_set)
+        others = other_categories[other_categories['category'] == cat]
+        other_locations = build_interval_index(zip(others['file'],others['begin'].tolist(),others['end'].tolist(),repeat(None)))
+        pattern, list_spacing_pattern = get_category_regex(cat)
+        categories.append({'cat_striped': cat.strip("[]"), 'pattern': pattern, 'locations': locations, 'other_locations': other_locations})
+    return categories
+
+def calculate_entities_location_metrics(entities,ent_cat,path,df,other_categories,list_isNotFP,list_isNotFN,ban_words_entities,store,workers=None):
+    """
+    Retrieves and sorts words from annotated texts into matching categories of several entities, then compares whether these words match any of the existing annotations. 
+    Each document is read once, all the categories of all the entities being searched in it (see "calculate_files_metrics"), and the documents can be split across worker processes.
+    
+    Parameters : 
+    entities (list) : the entities to evaluate.
+    ent_cat (dict) : List of all the entities paired with their categories.
+    path (string) : path of the current working directory.
+    df (dataframe) : Dataframe containing the annotated words, their occurrences, places and related entity.
+    other_categories (dataframe) : table of the annotations that could belong to another category, see "build_other_categories". 
+    list_isNotFP (dict) : index of the FP considered as TP, see "add_decision".
+    list_isNotFN (dict) : index of the FN disregarded, see "add_decision".
+    ban_words_entities (dict) : dictionnary of each entity and their related banwords. 
+    store (dict) : the annotation store, where the places of the annotations are read.
+    workers (int) : number of worker processes checking the documents, None to check them sequentially. The results do not depend on it.
+    
+    Return :
+    (dict) : dictionnary of each entity and the locations of each categorized word, and whether they are true positive, false positive or false negative. 
+    """
+    txt_files = get_corpus_files(path)
+    txt_files_set = set(txt_files)
+    
+    # 1 -  storage of places of each annotations categorised in "locations"
+    entities_categories = [create_entity_categories(entity,ent_cat,df,other_categories,store,txt_files_set) for entity in entities]
+    entities_banwords = [[banword for banword in ban_words_entities[entity] if banword!="None"] for entity in entities]
+    
+    # 2 - Verification of all the categories in each document : TP,FP and FN
+    entities_metrics = [[[] for category in categories] for categories in entities_categories]
+    for files_metrics in iter_documents_metrics(path,txt_files,entities_categories,entities_banwords,list_isNotFP,list_isNotFN,workers):
+        for categories_metrics, documents_metrics in zip(entities_metrics,files_metrics):
+            for category_metrics, document_metrics in zip(categories_metrics,documents_metrics):
+                category_metrics.append(document_metrics)
+    # The locations are ordered by category, then by file
+    location_metrics = {}
+    for entity, categories_metrics in zip(entities,entities_metrics):
+        location_metrics[entity] = []
+        for category_metrics in categories_metrics:
+            for document_metrics in category_metrics:
+                location_metrics[entity].extend(document_metrics)
                 
     return location_metrics
 
+def calculate_location_metrics(current_entity,ent_cat,path,df,other_categories,list_isNotFP,list_isNotFN,ban_words_entities,store,workers=None):
+    """
+    Retrieves and sorts words from annotated texts into matching categories, then compares whether these words match any of the existing annotations, 
+    see "calculate_entities_location_metrics".
+    
+    Parameters : 
+    current_entity (string) : the current selected entity.
+    ent_cat (dict) : List of all the entities paired with their categories.
+    path (string) : path of the current working directory.
+    df (dataframe) : Dataframe containing the annotated words, their occurrences, places and related entity.
+    other_categories (dataframe) : table of the annotations that could belong to another category, see "build_other_categories". 
+    list_isNotFP (dict) : index of the FP considered as TP, see "add_decision".
+    list_isNotFN (dict) : index of the FN disregarded, see "add_decision".
+    ban_words_entities (dict) : dictionnary of each entity and their related banwords. 
+    store (dict) : the annotation store, where the places of the annotations are read.
+    workers (int) : number of worker processes checking the documents, None to check them sequentially. The results do not depend on it.
+    
+    Return :
+    (dict) : dictionnary containing the locations of each categorized word, and whether they are true positive, false positive or false negative. 
+    """
+    return calculate_entities_location_metrics([current_entity],ent_cat,path,df,other_categories,list_isNotFP,list_isNotFN,ban_words_entities,store,workers)
+
 
 def calculate_df_metrics(df_location_metrics):
     """
     Calculate the precision and recall score in each category. 
+    The results of each category are counted at once by a crosstab of the categories and the results.
     
     Parameters : 
     df_location_metrics (dataframe) : contains the locations of each categorized word, and whether they are true positive, false positive or false negative.
@@ -127,24 +303,18 @@ def calculate_df_metrics(df_location_metrics):
     Return :
     df_metrics (dataframe) : dataframe containing the precision and recall score in each category.  
     """
+    categories = df_location_metrics['category'].unique()
+    counts = pd.crosstab(df_location_metrics['category'],df_location_metrics['result']).reindex(index=categories,columns=["TP(corr)","TP","FP","FN"],fill_value=0)
+    TPcorr = counts["TP(corr)"].to_numpy()
+    TP = counts["TP"].to_numpy()
+    FP = counts["FP"].to_numpy()
+    FN = counts["FN"].to_numpy()
+    precision = np.divide(TP+TPcorr, TP+TPcorr+FP, out=np.zeros(len(counts)), where=(TP+FP != 0))
+    recall = np.divide(TP+TPcorr, TP+TPcorr+FN, out=np.zeros(len(counts)), where=(TP+FN != 0))
     
-    metrics = []
-    for cat in df_location_metrics['category'].unique():
-        TP = df_location_metrics[(df_location_metrics['category'] == cat) & (df_location_metrics['result'] == "TP")].shape[0]
-        TPcorr = df_location_metrics[(df_location_metrics['category'] == cat) & (df_location_metrics['result'] == "TP(corr)")].shape[0]
-        FP = df_location_metrics[(df_location_metrics['category'] == cat) & (df_location_metrics['result'] == "FP")].shape[0]
-        FN = df_location_metrics[(df_location_metrics['category'] == cat) & (df_location_metrics['result'] == "FN")].shape[0]
-        precision = 0
-        if TP+FP !=0:
-            precision = round((TP+TPcorr)/(TP+TPcorr+FP),2)
-        recall = 0 
-        if TP+FN !=0:
-            recall= round((TP+TPcorr)/(TP+TPcorr+FN),2) 
-        metrics.append([cat,TPcorr,TP,FP,FN,precision,recall])
-        
-    df_metrics = pd.DataFrame(metrics,columns=["category","TP(corr)","TP","FP","FN", "precision","recall"])
-    df_metrics["precision"] = df_metrics["precision"].round(2)
-    df_metrics["recall"] = df_metrics["recall"].round(2)
+    df_metrics = pd.DataFrame({"category": categories, "TP(corr)": TPcorr, "TP": TP, "FP": FP, "FN": FN,
+                               "precision": [round(value,2) for value in precision.tolist()],
+                               "recall": [round(value,2) for value in recall.tolist()]})
     if df_metrics["TP(corr)"].sum() == 0 :
         df_metrics.drop(columns=["TP(corr)"], inplace=True)
     return df_metrics
@@ -274,6 +444,41 @@ def generate_dg_metrics_results(df_metrics):
     
     return dg_metrics_results
 
+def get_context_places(places):
+    """
+    Return the place of a location in its text with context (the 'text' of the location metrics, see "calculate_document_metrics").
+    
+    Parameters : 
+    places (list) : [start, end] of the location in the document.
+    
+    Return :
+    (tuple) : the beginning and the end of the location in its text with context.
+    """
+    start = len("...") + places[0] - max(places[0]-METRICS_CONTEXT_LENGTH,0)
+    return start, start + places[1] - places[0]
+
+def find_common_string(motif, text, overlapping=None):
+    """
+    Find the longest part of a text matching a part of a motif, with the suffix automaton of the longest of the two strings (see "find_longest_common_substring").
+    If several parts are the longest, the first one of the shortest string is returned.
+    
+    Parameters : 
+    motif (string) : motif to check.  
+    text (string) : text where the motif is checked. 
+    overlapping (tuple) : (beginning, end) of a part of the text, to only find the parts of the text overlapping it (the first one if several are the longest). 
+                          None to find them anywhere in the text.
+    
+    Return :
+    (tuple) : the beginning and the end of the matching part in the text, None if the motif and the text have nothing in common.
+    """
+    if len(motif)>len(text) or overlapping is not None:
+        start, motif_start, length = find_longest_common_substring(create_suffix_automaton(motif), text, overlapping)
+    else:
+        motif_start, start, length = find_longest_common_substring(create_suffix_automaton(text), motif)
+    if not length:
+        return None
+    return start, start+length
+
 def compare_common_string(motif, text):
     """
     Check if a motif or a part of it is present in a text. 
@@ -285,20 +490,7 @@ def compare_common_string(motif, text):
     Return :
     (string) : return the part of the text matching with the motif.
     """
-    if len(motif)>len(text):
-        temp_motif = motif
-        motif = text
-        text = temp_motif
-    pattern = re.compile(re.escape(motif))
-    match = pattern.search(text)
-    if match:
-        return match.group()
-    else:
-        for length in range(len(motif), 0, -1):
-            for start in range(len(motif) - length + 1):
-                sub_pattern = re.escape(motif[start:start+length])
-                match = re.search(sub_pattern, text)
-                if match:
-                    return match.group()
-    return ""
-
+    common_places = find_common_string(motif, text)
+    if common_places is None:
+        return ""
+    return text[common_places[0]:common_places[1]]
@@ -6,6 +6,9 @@ import seaborn as sns
 import pandas as pd
 import numpy as np
 import ipywidgets as widgets
+from ..extraction.store import get_store_places
+from ..extraction.corpus import iter_corpus_texts
+from .intervals import build_interval_index, find_containing
 
 def check_spacing_regex_locations(spacing_regex,path,len_constant):
     """
@@ -22,25 +25,18 @@ def check_spacing_regex_locations(spacing_regex,path,len_constant):
 
     """
     spacing_regex_results = []
-    txt_files = []
     regex= r"\b" + "(" + spacing_regex + ")" + r"\b"
     constant_dist=len_constant
     
-    for filename in os.listdir(path):
-        if filename.endswith(".txt"):
-            txt_files.append(filename)
-    
-    for filename in txt_files:
-        with open(os.path.join(path, filename), 'r', newline='',encoding='utf-8') as file:
-            text = file.read().lower()
-            for match in re.finditer(regex, text):
-                place_start = match.start()
-                place_end = match.end()
-                spacing_regex_results.append([regex, filename, [place_start,place_end],"?",((place_end-place_start)-constant_dist)])
+    for filename, text in iter_corpus_texts(path):
+        for match in re.finditer(regex, text):
+            place_start = match.start()
+            place_end = match.end()
+            spacing_regex_results.append([regex, filename, [place_start,place_end],"?",((place_end-place_start)-constant_dist)])
         
     return spacing_regex_results
 
-def compare_spacing_regex_locations(spacing_regex_results,current_entity,df):
+def compare_spacing_regex_locations(spacing_regex_results,current_entity,df,store):
     """
     Compare all the match of a spacing regex from the text with the annotations (highlights) made by the expert.
     If it corresponds to an existing highlight, the match is considered as a "TP", else as a "FP".
@@ -49,19 +45,17 @@ def compare_spacing_regex_locations(spacing_regex_results,current_entity,df):
     spacing_regex_results (list) : list of all the match between a spacing regex and the corpus. 
     current_entity (str) : current working entity selected. 
     df (dataframe) : Dataframe containing the annotated words, their occurrences, places and related entity.
+    store (dict) : the annotation store, where the places of the annotations are read.
     
     Return :
     (list) : spacing_regex_results list updated with the value
     """
     updated_spacing_regex_results=[]
+    annotations = build_interval_index((place[0]+".txt",place[1],place[2],row['text']) for index,row in df[df['entity']==current_entity].iterrows()
+                                       for place in get_store_places(store,row['places']))
     
     for regex,filename,[place_start,place_end],value,distance in spacing_regex_results:
-        add_to_TP = False
-        for index,row in df[df['entity']==current_entity].iterrows():
-            for place in row['places']:
-                if (place[0]+".txt"==filename and place[1]<=place_start and place_end<=place[2] and re.finditer(regex,row['text'])):
-                    add_to_TP = True
-                    break
+        add_to_TP = find_containing(annotations,filename,place_start,place_end) is not None
                     
         if add_to_TP : updated_spacing_regex_results.append([regex, filename, [place_start,place_end],"TP",distance])
         else : updated_spacing_regex_results.append([regex, filename, [place_start,place_end],"FP",distance])
@@ -104,7 +98,7 @@ def create_fig_recommandation(spacing_regex_values, title):
 
     return plt
 
-def create_accordion_recommendations(list_spacing_regex,path,current_entity,df):
+def create_accordion_recommendations(list_spacing_regex,path,current_entity,df,store):
     """
     Calculate and return an output displaying the recommandation distance figure for the dashed (spacing regex).
     
@@ -113,6 +107,7 @@ def create_accordion_recommendations(list_spacing_regex,path,current_entity,df):
     path (string) : string containing the dataset path. 
     current_entity (str) : current working entity selected.    
     df (dataframe) : Dataframe containing the annotated words, their occurrences, places and related entity.
+    store (dict) : the annotation store, where the places of the annotations are read.
     
     Return :
     widgets.Output(): output that displays the recommandation distance figure for the dashed (spacing regex).
@@ -123,7 +118,7 @@ def create_accordion_recommendations(list_spacing_regex,path,current_entity,df):
         with output_recommendations:
             for index,spacing_regex in enumerate(list_spacing_regex) :
                 spacing_regex_results = check_spacing_regex_locations(spacing_regex[0],path,spacing_regex[1])
-                spacing_regex_results_compared = compare_spacing_regex_locations(spacing_regex_results,current_entity,df)
+                spacing_regex_results_compared = compare_spacing_regex_locations(spacing_regex_results,current_entity,df,store)
                 df_spacing_regex_results = pd.DataFrame(spacing_regex_results_compared, columns=["regex", "filename", "location", "value", "distance"])
                 spacing_regex_values = df_spacing_regex_results[['value', 'distance']].values.tolist()
                 fig = create_fig_recommandation(spacing_regex_values,str(spacing_regex[2]))
@@ -1,7 +1,15 @@
 #from F.text.fr import pluralize
 from unidecode import unidecode
+from functools import lru_cache
+import os
 import re
 
+REGEX_CACHE_SIZE = 1024
+REGEX_SPECIAL_CHARACTERS = set(".^$*+?{}[]\\|()")
+REGEX_BACKENDS = ["flat", "trie"]
+# Backend used to compile the categories regex, see "set_regex_backend"
+regex_settings = {'backend': "flat"}
+
 def generate_plural_form(word):
     """
     Return the word and its plural form.
@@ -36,12 +44,52 @@ def is_parenthese_diff(regex):
     else :
         return False
 
-def generate_regex(words):
+def is_literal_word(word):
+    """
+    Check if a word of a category is a literal word (it contains no regex special character).
+    
+    Parameters : 
+    word (str) : a word of a category. 
+    
+    Return :
+    (boolean) : return true if the word is a literal word. 
+    """
+    return not any(char in REGEX_SPECIAL_CHARACTERS for char in word)
+
+def generate_trie_regex(words):
+    """
+    Create the alternation of literal words, the common prefixes of consecutive words being merged (as in a trie), 
+    so that the regex engine compares each prefix once instead of once per word. 
+    Only consecutive words are merged : the alternatives are tried in the same order as in "a|b|c|...", and the matches are the same.
+    
+    Parameters : 
+    words (list) : list of literal words. 
+    
+    Return :
+    (string) : the regex of the alternation.
+    """
+    alternatives = []
+    i = 0
+    while i < len(words):
+        j = i + 1
+        if words[i]:
+            while j < len(words) and words[j][:1] == words[i][:1]:
+                j += 1
+        if j - i == 1:
+            alternatives.append(words[i])
+        else :
+            prefix = os.path.commonprefix(words[i:j])
+            alternatives.append(prefix + "(?:" + generate_trie_regex([word[len(prefix):] for word in words[i:j]]) + ")")
+        i = j
+    return "|".join(alternatives)
+
+def generate_regex(words,backend="flat"):
     """
     Create a regex from the words in input.
     
     Parameters : 
     words (list) : list containing the different words to transform into a regex. 
+    backend (string) : "flat" to join the words in a flat alternation, "trie" to merge the common prefixes of consecutive literal words (see "generate_trie_regex").
     
     Return :
     (regex) : the created regex.
@@ -54,10 +102,21 @@ def generate_regex(words):
     lastIsWord = False
     len_constant_parts = 0
     list_spacing_regex = []
+    literal_words = [] # consecutive literal words, merged by the "trie" backend
     
     for word in words:
         word = word.lower()
         spacing_word,len_spacing_word = generate_spacing_word(word,spacing=None)
+        if backend == "trie" and not spacing_word and word not in connectors and is_literal_word(word):
+            if lastIsWord and not literal_words:
+                regex += "|"
+            literal_words.append(word)
+            lastIsWord = True
+            continue
+        if literal_words:
+            regex += generate_trie_regex(literal_words)
+            literal_words = []
+            
         if spacing_word :
             max_spacing_word,max_word_len = generate_spacing_word(word, spacing=500)
             list_spacing_regex.append([max_spacing_word,max_word_len,word])
@@ -87,6 +146,8 @@ def generate_regex(words):
             regex += word
             lastIsWord = True
                 
+    if literal_words:
+        regex += generate_trie_regex(literal_words)
     if inOr:
         regex += ')?'     
     if is_parenthese_diff(regex):
@@ -96,6 +157,69 @@ def generate_regex(words):
     regex = re.compile(regex, flags = re.UNICODE | re.DOTALL)
     return regex,list_spacing_regex
     
+@lru_cache(maxsize=REGEX_CACHE_SIZE)
+def get_category_regex(cat):
+    """
+    Return the regex of a category, parsed and compiled once : the regex of the last categories used are kept in a LRU cache.
+    
+    Parameters : 
+    cat (string) : the category, string representation of the list of its words. 
+    
+    Return :
+    (regex) : the compiled regex of the category.
+    list_spacing_regex (tuple) : the spacing regex of the category (used in the recommandations), see "generate_regex". 
+                                 The cached value is shared by all the callers, so it is returned as a tuple of tuples, that cannot be modified.
+    """
+    regex, list_spacing_regex = generate_regex(eval(cat),backend=regex_settings['backend'])
+    return regex, tuple(tuple(spacing_regex) for spacing_regex in list_spacing_regex)
+
+def set_regex_backend(backend):
+    """
+    Choose the backend used to compile the categories regex, and empty the cache of the regex compiled with the previous backend.
+    
+    Parameters : 
+    backend (string) : "flat" (default) or "trie", see "generate_regex".
+    """
+    if backend not in REGEX_BACKENDS:
+        raise ValueError("Unknown regex backend : " + str(backend))
+    regex_settings['backend'] = backend
+    clear_regex_cache()
+
+def get_regex_cache_stats():
+    """
+    Return the statistics of the cache of the categories regex.
+    
+    Return :
+    (dict) : number of hits and misses of the cache, current and maximal number of regex kept.
+    """
+    info = get_category_regex.cache_info()
+    return {'hits': info.hits, 'misses': info.misses, 'size': info.currsize, 'maxsize': info.maxsize}
+
+def clear_regex_cache():
+    """
+    Empty the cache of the categories regex, and reset its statistics.
+    """
+    get_category_regex.cache_clear()
+
+def calculate_match_table(cats,texts):
+    """
+    Find the categories matching each text, the compiled regex of each category being searched in all the texts.
+    
+    Parameters : 
+    cats (list) : the categories, string representations of the list of their words. 
+    texts (list) : the texts.
+    
+    Return :
+    (list) : for each text, the list of the indexes (in 'cats') of the categories matching the text, in order.
+    """
+    table = [[] for text in texts]
+    for i, cat in enumerate(cats):
+        search = get_category_regex(cat)[0].search
+        for matches, text in zip(table, texts):
+            if search(text):
+                matches.append(i)
+    return table
+
 def generate_spacing_word(word,spacing):
     """
     Check if there is a different number of open and close brackets in the string.
@@ -141,7 +265,7 @@ def calculate_list_spacing_regex(entity,ent_cat):
     list_spacing = []
     for cat in ent_cat[entity] :
         if cat != "category?":
-            pattern, list_spacing_pattern = generate_regex(eval(cat))    
+            pattern, list_spacing_pattern = get_category_regex(cat)
             list_spacing.extend(list_spacing_pattern)
     return list_spacing
 
@@ -3,6 +3,10 @@ import math
 import re
 import random
 import pandas as pd
+from .metrics import calculate_entities_location_metrics, calculate_df_metrics
+from .bootstrap import estimate_confidence_intervals_bootstrap
+
+METRICS_LOCATIONS_COLUMNS = ["category", "result","isNotFP","isNotFN","text","file", "places","annotation","motif"]
 
 def initiate_df_results(df,homogeneity_score,ent_cat):
     """
@@ -62,6 +66,46 @@ def update_df_results(df_results,df,entity,homogeneity_score,df_metrics,bootstra
     
     return df_results
 
+def evaluate_entities(entities,ent_cat,path,df,other_categories,list_isNotFP,list_isNotFN,ban_words_entities,store,df_results,homogeneity_score,workers=None,draw_number=1000,alpha=5.0,seed=None):
+    """
+    Evaluate several entities in one run : their location metrics are calculated with one read of the corpus (see "calculate_entities_location_metrics"),
+    then the metrics of their categories, the confidence intervals and their results in 'df_results'.
+    
+    Parameters : 
+    entities (list) : the entities to evaluate.
+    ent_cat (dict) : List of all the entities paired with their categories.
+    path (string) : path of the current working directory.
+    df (dataframe) : Dataframe containing the annotated words, their occurrences, places and related entity, categorized.
+    other_categories (dataframe) : table of the annotations that could belong to another category, see "build_other_categories". 
+    list_isNotFP (dict) : index of the FP considered as TP, see "add_decision".
+    list_isNotFN (dict) : index of the FN disregarded, see "add_decision".
+    ban_words_entities (dict) : dictionnary of each entity and their related banwords. 
+    store (dict) : the annotation store, where the places of the annotations are read.
+    df_results (dataframe) : contains the summary of each entity's results (homogeneity,precision,recall).
+    homogeneity_score (dict) : dictionnary containing the entities and their associated homogeneity score.
+    workers (int) : number of worker processes checking the documents, None to check them sequentially.
+    draw_number (int) : number of times that we draw files for the confidence intervals.
+    alpha (int) : percentage of the distribution that falls outside the confidence intervals.
+    seed (int) : seed of the draws, None to not seed them. The draws of each entity are seeded with the seed and the entity, 
+                 so that its confidence intervals do not depend on the other evaluated entities.
+    
+    Return :
+    df_results (dataframe) : the updated summary of each entity's results.
+    entities_metrics (dict) : dictionnary of each entity and its location metrics and category metrics dataframes, see "calculate_df_metrics".
+    """
+    location_metrics = calculate_entities_location_metrics(entities,ent_cat,path,df,other_categories,list_isNotFP,list_isNotFN,ban_words_entities,store,workers)
+    entities_metrics = {}
+    for entity in entities:
+        df_metrics_locations = pd.DataFrame(location_metrics[entity],columns=METRICS_LOCATIONS_COLUMNS)
+        df_metrics = calculate_df_metrics(df_metrics_locations)
+        Xdf = df[df['entity']==entity]
+        if seed is not None:
+            random.seed(f"{seed}:{entity}")
+        bootstrap_results = estimate_confidence_intervals_bootstrap(Xdf,entity,df_metrics_locations,store,draw_number=draw_number,alpha=alpha)
+        df_results = update_df_results(df_results,df,entity,homogeneity_score,df_metrics,bootstrap_results)
+        entities_metrics[entity] = {'locations': df_metrics_locations, 'metrics': df_metrics}
+    return df_results, entities_metrics
+
 def create_categories_infos(df,ent_cat,current_entity):
     """
     Calculate the number of categorized annotations (total and unique).
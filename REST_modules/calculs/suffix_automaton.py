@@ -0,0 +1,85 @@
+def create_suffix_automaton(text):
+    """
+    Create the suffix automaton of a text, recognizing all its substrings. It is built in linear time,
+    so that the longest common substring of the text and another string is found in linear time (see "find_longest_common_substring").
+
+    Parameters :
+    text (string) : the text.
+
+    Return :
+    (dict) : the suffix automaton, with for each state its 'lengths' (length of its longest substring), 'links' (suffix link),
+             'transitions' (dictionnary of each character and the next state) and 'first_ends' (end of the first occurrence of its substrings in the text).
+    """
+    automaton = {'lengths': [0], 'links': [-1], 'transitions': [{}], 'first_ends': [-1]}
+    lengths = automaton['lengths']
+    links = automaton['links']
+    transitions = automaton['transitions']
+    first_ends = automaton['first_ends']
+    last = 0
+    for position, character in enumerate(text):
+        current = len(lengths)
+        lengths.append(lengths[last] + 1)
+        links.append(0)
+        transitions.append({})
+        first_ends.append(position)
+        state = last
+        while state != -1 and character not in transitions[state]:
+            transitions[state][character] = current
+            state = links[state]
+        if state != -1:
+            next_state = transitions[state][character]
+            if lengths[state] + 1 == lengths[next_state]:
+                links[current] = next_state
+            else:
+                # the state is split : the clone keeps the shorter substrings
+                clone = len(lengths)
+                lengths.append(lengths[state] + 1)
+                links.append(links[next_state])
+                transitions.append(dict(transitions[next_state]))
+                first_ends.append(first_ends[next_state])
+                while state != -1 and transitions[state].get(character) == next_state:
+                    transitions[state][character] = clone
+                    state = links[state]
+                links[next_state] = clone
+                links[current] = clone
+        last = current
+    return automaton
+
+def find_longest_common_substring(automaton, pattern, overlapping=None):
+    """
+    Find the longest common substring of the text of a suffix automaton and a pattern. If several substrings are the longest,
+    the first one in the pattern is returned, with its first occurrence in the text.
+
+    Parameters :
+    automaton (dict) : the suffix automaton of the text, see "create_suffix_automaton".
+    pattern (string) : the pattern.
+    overlapping (tuple) : (beginning, end) of a part of the pattern, to only find the substrings of the pattern overlapping it. None to find them anywhere in the pattern.
+
+    Return :
+    (tuple) : the beginning of the substring in the pattern, its beginning in the text and its length (0 if there is no common substring).
+    """
+    lengths = automaton['lengths']
+    links = automaton['links']
+    transitions = automaton['transitions']
+    state = 0
+    length = 0
+    best_state = 0
+    best_length = 0
+    best_end = -1
+    for position, character in enumerate(pattern):
+        while state and character not in transitions[state]:
+            state = links[state]
+            length = lengths[state]
+        if character in transitions[state]:
+            state = transitions[state][character]
+            length += 1
+        if overlapping is not None and (position < overlapping[0] or position - length + 1 >= overlapping[1]):
+            # the match ending here does not overlap the part, and its shorter suffixes neither
+            continue
+        if length > best_length:
+            best_state = state
+            best_length = length
+            best_end = position
+    if not best_length:
+        return 0, 0, 0
+    return best_end - best_length + 1, automaton['first_ends'][best_state] - best_length + 1, best_length
@@ -1,46 +1,130 @@
+import weakref
 import pandas as pd
+import numpy as np
 import ipywidgets as widgets
 from .calculs import *
 from .extraction.normalisation import getEnt
+from .extraction.decisions import create_decisions_index, add_decision
 
-def calculate_categorization(df,ent_cat,current_entity,other_categories,list_spacing_regex):
+# State of the last categorization : the df categorized, the categories of each entity and the other categories of their rows.
+# Only the entities whose categories changed since the last categorization of the same df are categorized again.
+categorization_state = {'df': None, 'length': 0, 'ent_cat': {}, 'other_rows': {}}
+
+def reset_categorization_state():
+    """
+    Forget the last categorization, so that all the entities are categorized again by the next categorization.
+    """
+    categorization_state.update({'df': None, 'length': 0, 'ent_cat': {}, 'other_rows': {}})
+
+def get_changed_entities(df,ent_cat):
+    """
+    Return the entities whose categories changed since the last categorization of the df (all the entities if the df was not categorized yet),
+    and the entities that were categorized but are not in ent_cat anymore.
+    
+    Parameters : 
+    df (dataframe) : Dataframe containing the annotated words, their occurrences, places and related entity.
+    ent_cat (dict) : dictionnary of the entities and their related categories. 
+    
+    Return :
+    (list) : the entities to categorize again, or to reset to "category?".
+    """
+    state = categorization_state
+    if state['df'] is None or state['df']() is not df or state['length'] != len(df) or 'category' not in df:
+        reset_categorization_state()
+        state['df'] = weakref.ref(df)
+        state['length'] = len(df)
+        df['category'] = "category?"
+    changed = [ent for ent in ent_cat if state['ent_cat'].get(ent) != tuple(ent_cat[ent])]
+    changed.extend(ent for ent in state['ent_cat'] if ent not in ent_cat)
+    return changed
+
+def build_other_categories(store,entities,categories,texts,places):
+    """
+    Build the table of the other categories of the annotations : each annotation matching several categories has one line per place
+    for each category after the first one.
+    
+    Parameters : 
+    store (dict) : the annotation store, where the places of the annotations are read.
+    entities (array) : entity of each annotation.
+    categories (array) : other category of each annotation.
+    texts (array) : text of each annotation.
+    places (array) : rows of the store of each annotation.
+    
+    Return :
+    (dataframe) : table with the columns 'entity', 'category', 'text', 'file' (.txt file), 'begin' and 'end' (place in the file).
+    """
+    lengths = np.array([len(annotation_places) for annotation_places in places], dtype=np.int64)
+    rows = np.concatenate([np.zeros(0,dtype=np.int64)]+[np.asarray(annotation_places,dtype=np.int64) for annotation_places in places])
+    files = np.array([doc+".txt" for doc in store['docs']], dtype=object)
+    return pd.DataFrame({
+        'entity': np.repeat(np.asarray(entities,dtype=object),lengths),
+        'category': np.repeat(np.asarray(categories,dtype=object),lengths),
+        'text': np.repeat(np.asarray(texts,dtype=object),lengths),
+        'file': files[store['doc_id'][rows]],
+        'begin': store['begin'][rows],
+        'end': store['end'][rows],
+    })
+
+def calculate_categorization(df,ent_cat,current_entity,other_categories,list_spacing_regex,store):
     """
     For each entered terms in the entity's category, this fonction creates a regex that will match with the annotations.
     If an annotation match with a category, it will return the updated df. Also, 
+    Only the entities whose categories changed since the last categorization are categorized again, see "get_changed_entities".
     
     Parameters : 
     df (dataframe) : Dataframe containing the annotated words, their occurrences, places and related entity.
     current_entity (string) : String of the current working entity.
-    other_categories (list) : List containing the other possible category that annotations could belong to. 
+    other_categories (dataframe) : Table of the other possible category that annotations could belong to. 
     list_spacing_regex (list) : List of all the discontinued regex that will appear in the recommandations section
+    store (dict) : the annotation store, where the places of the annotations are read.
 
     Return :
     df (dataframe) : Return a dataframe containing the annotations belonging to the selected category. 
-    other_categories (list) : Return a list containing the other possible category that annotations could belong to. 
+    other_categories (dataframe) : Return the table of the other possible category that annotations could belong to, see "build_other_categories". 
     list_spacing_regex (list) : Resturn the list of all the discontinued regex that will appear in the recommandations section. 
     """    
     list_spacing_regex=[]
-    other_categories=[]
-    df['category']= "category?" #reset to "category?" to reset estimation
     ent_cat[current_entity] = [element for element in ent_cat[current_entity] if element != '[]'] #Erase all '[]' categories
-    for ent in ent_cat:
-        for cat in ent_cat[ent]:
-            if cat != "category?":
-                pattern, list_spacing_pattern = generate_regex(eval(cat))    
-                if list_spacing_pattern and ent == current_entity:
-                    list_spacing_regex.extend(list_spacing_pattern)
-                mask = (df['entity'] == ent) & df['text'].apply(lambda text: bool(re.search(pattern, text)))
-                df.loc[mask, 'category'] = df.loc[mask, 'category'].apply(lambda x: x + 'AND' + cat)
+    for cat in ent_cat[current_entity]:
+        if cat != "category?":
+            list_spacing_regex.extend(get_category_regex(cat)[1])
+
+    changed_entities = get_changed_entities(df,ent_cat)
+    entities = df['entity'].to_numpy()
+    texts = df['text'].to_numpy()
+    places = df['places'].to_numpy()
+    if changed_entities:
+        categories = df['category'].to_numpy(dtype=object, copy=True)
+        for ent in changed_entities:
+            rows = np.flatnonzero(entities == ent)
+            categories[rows] = "category?" #reset to "category?" to reset estimation
+            categorization_state['other_rows'].pop(ent, None)
+            categorization_state['ent_cat'].pop(ent, None)
+            if ent not in ent_cat:
+                continue
+            categorization_state['ent_cat'][ent] = tuple(ent_cat[ent])
+            cats = [cat for cat in ent_cat[ent] if cat != "category?"]
+            if not cats or not len(rows):
+                continue
+            # The categories are matched once per distinct text of the entity
+            codes, unique_texts = pd.factorize(texts[rows])
+            match_table = calculate_match_table(cats,unique_texts)
+            first_categories = np.array([cats[matches[0]] if matches else "category?" for matches in match_table], dtype=object)
+            categories[rows] = first_categories[codes]
+            several = np.array([len(matches) > 1 for matches in match_table], dtype=bool)
+            # rows matching several categories, repeated for each of their other categories
+            other_positions = np.flatnonzero(several[codes])
+            other_cats = [[cats[i] for i in match_table[codes[position]][1:]] for position in other_positions]
+            categorization_state['other_rows'][ent] = (np.repeat(rows[other_positions],[len(row_cats) for row_cats in other_cats]), [cat for row_cats in other_cats for cat in row_cats])
+        df['category'] = categories
                     
     #Calculation of "other_categories"
-    for index,row in df.iterrows():
-        categories = row['category'].split("AND")
-        for i, category in enumerate(categories):
-            if i > 1:
-                for place in row['places']:
-                    other_categories.append([row['entity'],category.strip(),row['text'],place[0]+".txt",[place[1],place[2]]])
-        if len(categories) > 1: 
-            df.at[index, 'category'] = categories[1].strip() 
+    other_rows = list(categorization_state['other_rows'].values())
+    rows = np.concatenate([np.zeros(0,dtype=np.int64)]+[entity_rows for entity_rows, entity_cats in other_rows])
+    cats = np.array([cat for entity_rows, entity_cats in other_rows for cat in entity_cats], dtype=object)
+    order = np.argsort(rows, kind='stable')
+    rows, cats = rows[order], cats[order]
+    other_categories = build_other_categories(store,entities[rows],cats,texts[rows],places[rows])
             
     return df,other_categories,list_spacing_regex
 
@@ -55,9 +139,9 @@ def remove_empty_categories(dict_ent_cat,current_entity):
     return dict_ent_cat
 
 def modify_list_isNotFP(list_isNot,new_value):
-    list_isNot_temp = []  
+    list_isNot_temp = create_decisions_index()
     v0 = ', '.join(f"'{element}'" for element in new_value)
-    for values in list_isNot:
-        if values[8] in new_value:
-            list_isNot_temp.append([v0,values[1],values[2],values[3],values[4],values[5],values[6],values[7],values[8]])
+    for (category, file_name, start, end), motif in list_isNot.items():
+        if motif in new_value:
+            add_decision(list_isNot_temp,v0,file_name,[start,end],motif)
     return list_isNot_temp
\ No newline at end of file
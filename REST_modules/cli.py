@@ -0,0 +1,231 @@
+"""
+Headless evaluation of the categories of a corpus, without the jupyter interface.
+
+Loads the corpus and the progress saved by the interface ("REST_progress.json"), categorizes the annotations,
+then calculates the location metrics, the category metrics and the confidence intervals of the chosen entities,
+and writes the results in json and/or csv files.
+
+The entities are evaluated by batches, each batch reading the corpus once. After each batch, the results are saved
+in a checkpoint file, so that an interrupted evaluation can be resumed with "--resume".
+
+Usage :
+    python -m REST_modules.cli CORPUS_PATH [--progress REST_progress.json] [--entities ENTITY ...] [--output DIRECTORY]
+                                           [--format json csv] [--workers N] [--resume] [--cache]
+"""
+import argparse
+import hashlib
+import json
+import os
+import pandas as pd
+
+from .loading import load_data_annotations, load_json
+from .categorization import calculate_categorization, reset_categorization_state, remove_empty_categories
+from .calculs.results import evaluate_entities, initiate_df_results
+from .extraction.corpus import get_txt_signatures
+from .extraction.decisions import create_decisions_index, serialize_decisions
+
+CHECKPOINT_VERSION = 1
+CLI_BATCH_SIZE = 4
+CLI_FORMATS = ["json", "csv"]
+
+def create_parser():
+    """
+    Create the parser of the command line arguments.
+
+    Return :
+    (argparse.ArgumentParser) : the parser.
+    """
+    parser = argparse.ArgumentParser(prog="python -m REST_modules.cli", description="Evaluate the categories of the entities of a brat corpus, without the jupyter interface.")
+    parser.add_argument("corpus", help="path of the corpus directory (.txt and .ann files)")
+    parser.add_argument("--progress", default=None, help="progress file saved by the interface (default : REST_progress.json in the corpus directory)")
+    parser.add_argument("--entities", nargs="+", default=None, help="entities to evaluate (default : all the entities)")
+    parser.add_argument("--output", default=".", help="directory of the result files (default : current directory)")
+    parser.add_argument("--format", nargs="+", choices=CLI_FORMATS, default=["json"], help="formats of the result files (default : json)")
+    parser.add_argument("--locations", action="store_true", help="also write the location of each TP, FP and FN")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes (default : sequential)")
+    parser.add_argument("--batch-size", type=int, default=CLI_BATCH_SIZE, help=f"number of entities evaluated with one read of the corpus, between two checkpoints (default : {CLI_BATCH_SIZE})")
+    parser.add_argument("--checkpoint", default=None, help="checkpoint file (default : REST_checkpoint.json in the output directory)")
+    parser.add_argument("--resume", action="store_true", help="resume from the checkpoint, skipping the entities already evaluated with the same settings")
+    parser.add_argument("--draw-number", type=int, default=1000, help="number of draws of the bootstrap (default : 1000)")
+    parser.add_argument("--alpha", type=float, default=5.0, help="percentage outside the confidence intervals (default : 5.0)")
+    parser.add_argument("--seed", type=int, default=None, help="seed of the bootstrap draws, applied to each entity so that resumed results are the same")
+    parser.add_argument("--levenshtein-distance", type=int, default=None, help="merge the annotations closer than this Levenshtein distance")
+    parser.add_argument("--cache", action="store_true", help="keep the parsed annotations in REST_parse_cache.pickle in the corpus directory, to only parse the changed documents at the next evaluation")
+    parser.add_argument("--translation-backend", default=None, help="translate the annotations with this backend")
+    return parser
+
+def get_evaluation_signature(path,ent_cat,ban_words_entities,list_isNotFP,list_isNotFN,args):
+    """
+    Return the signature of the settings of an evaluation : the .txt files, the categories, the banwords, the reviewer decisions and the bootstrap parameters.
+    The results of a checkpoint are only reused if they were calculated with the same signature.
+
+    Parameters :
+    path (string) : string containing the dataset path.
+    ent_cat (dict) : List of all the entities paired with their categories.
+    ban_words_entities (dict) : dictionnary of each entity and their related banwords.
+    list_isNotFP (dict) : index of the FP considered as TP, see "add_decision".
+    list_isNotFN (dict) : index of the FN disregarded, see "add_decision".
+    args (argparse.Namespace) : the command line arguments.
+
+    Return :
+    (string) : the signature.
+    """
+    settings = {
+        'corpus': get_txt_signatures(path),
+        'ent_cat': ent_cat,
+        'ban_words_entities': ban_words_entities,
+        'list_isNotFP': sorted(serialize_decisions(list_isNotFP)),
+        'list_isNotFN': sorted(serialize_decisions(list_isNotFN)),
+        'bootstrap': [args.draw_number, args.alpha, args.seed],
+        'normalisation': [args.levenshtein_distance, args.translation_backend],
+        'locations': args.locations,
+    }
+    return hashlib.sha1(json.dumps(settings, ensure_ascii=False, sort_keys=True).encode('utf-8')).hexdigest()
+
+def load_checkpoint(checkpoint_path,signature):
+    """
+    Load the results of the entities already evaluated from a checkpoint file.
+
+    Parameters :
+    checkpoint_path (string) : path of the checkpoint file.
+    signature (string) : signature of the current settings, see "get_evaluation_signature".
+
+    Return :
+    (dict) : dictionnary of each evaluated entity and its results, empty if the checkpoint is missing, invalid or calculated with other settings.
+    """
+    if not os.path.isfile(checkpoint_path):
+        return {}
+    with open(checkpoint_path, 'r', encoding='utf-8') as file:
+        try:
+            checkpoint = json.load(file)
+        except json.JSONDecodeError:
+            return {}
+    if checkpoint.get('version') != CHECKPOINT_VERSION or checkpoint.get('signature') != signature:
+        print("The checkpoint was calculated with other settings, all the entities are evaluated")
+        return {}
+    return checkpoint['entities']
+
+def save_checkpoint(checkpoint_path,signature,entities_results):
+    """
+    Save the results of the entities already evaluated in a checkpoint file.
+
+    Parameters :
+    checkpoint_path (string) : path of the checkpoint file.
+    signature (string) : signature of the current settings, see "get_evaluation_signature".
+    entities_results (dict) : dictionnary of each evaluated entity and its results.
+    """
+    with open(checkpoint_path + '.tmp', 'w', encoding='utf-8') as file:
+        json.dump({'version': CHECKPOINT_VERSION, 'signature': signature, 'entities': entities_results}, file, ensure_ascii=False)
+    os.replace(checkpoint_path + '.tmp', checkpoint_path)
+
+def write_results(output,formats,entities,entities_results,locations):
+    """
+    Write the results of the evaluated entities :
+    -'REST_results' : the summary of each entity's results (homogeneity, precision, recall and their confidence intervals).
+    -'REST_categories' : the metrics of each category.
+    -'REST_locations' : the location of each TP, FP and FN, if asked.
+
+    Parameters :
+    output (string) : directory of the result files.
+    formats (list) : formats of the result files, "json" and/or "csv".
+    entities (list) : the evaluated entities, in the order of the results.
+    entities_results (dict) : dictionnary of each evaluated entity and its results.
+    locations (bool) : True to write the locations.
+
+    Return :
+    (list) : paths of the written files.
+    """
+    df_results = pd.DataFrame([entities_results[entity]['results'] for entity in entities])
+    df_categories = pd.DataFrame([dict(category, entity=entity) for entity in entities for category in entities_results[entity]['categories']])
+    df_locations = pd.DataFrame([dict(location, entity=entity) for entity in entities for location in entities_results[entity].get('locations', [])])
+    tables = {'REST_results': df_results, 'REST_categories': df_categories}
+    if locations:
+        tables['REST_locations'] = df_locations
+    for name, table in tables.items():
+        if 'entity' in table.columns:
+            tables[name] = table[['entity'] + [column for column in table.columns if column != 'entity']]
+
+    written = []
+    if "json" in formats:
+        json_path = os.path.join(output, 'REST_results.json')
+        with open(json_path, 'w', encoding='utf-8') as file:
+            json.dump({name.replace('REST_', ''): table.to_dict('records') for name, table in tables.items()}, file, ensure_ascii=False, indent=4)
+        written.append(json_path)
+    if "csv" in formats:
+        for name, table in tables.items():
+            csv_path = os.path.join(output, name + '.csv')
+            table.to_csv(csv_path, index=False)
+            written.append(csv_path)
+    return written
+
+def main(argv=None):
+    """
+    Run an evaluation from the command line arguments, see "create_parser".
+
+    Parameters :
+    argv (list) : the command line arguments, None to read them from "sys.argv".
+    """
+    parser = create_parser()
+    args = parser.parse_args(argv)
+    if not os.path.isdir(args.corpus):
+        parser.error(f"{args.corpus} is not a directory")
+    if args.batch_size < 1:
+        parser.error("--batch-size must be at least 1")
+    os.makedirs(args.output, exist_ok=True)
+    checkpoint_path = args.checkpoint or os.path.join(args.output, 'REST_checkpoint.json')
+    progress_path = args.progress or os.path.join(args.corpus, 'REST_progress.json')
+    if not os.path.isfile(progress_path):
+        parser.error(f"no progress file {progress_path} : save the categories in the interface, or give the progress file with --progress")
+
+    # 1 - Loading of the corpus and of the progress
+    path,ent_cat,ban_words_entities,df,df_tf_results,homogeneity_score,ban_words_tfidf,current_entity,store = load_data_annotations(args.corpus,workers=args.workers,levenshtein_distance=args.levenshtein_distance,translation_backend=args.translation_backend,cache=args.cache)
+    var = load_json(path,df,homogeneity_score,ent_cat,progress_path)
+    if 'ent_cat' not in var:
+        parser.error(f"no categories found in the progress file {progress_path}")
+    ent_cat = var.get('ent_cat', ent_cat)
+    list_isNotFP = var.get('list_isNotFP', create_decisions_index())
+    list_isNotFN = var.get('list_isNotFN', create_decisions_index())
+    ban_words_entities = var.get('ban_words_entities', ban_words_entities)
+    df_results = var['df_results']
+    missing = [entity for entity in ent_cat if entity not in set(df_results['entity'])]
+    if missing:
+        df_results = pd.concat([df_results, initiate_df_results(df,homogeneity_score,{entity: ent_cat[entity] for entity in missing})], ignore_index=True)
+    entities = args.entities or list(ent_cat)
+    unknown = [entity for entity in entities if entity not in ent_cat]
+    if unknown:
+        parser.error("unknown entities : " + ", ".join(unknown))
+
+    # 2 - Categorization
+    for entity in entities:
+        ent_cat = remove_empty_categories(ent_cat,entity)
+    if all(cat == "category?" for entity in entities for cat in ent_cat[entity]):
+        parser.error("the entities to evaluate have no categories in the progress file " + progress_path)
+    reset_categorization_state()
+    df,other_categories,list_spacing_regex = calculate_categorization(df,ent_cat,entities[0],None,[],store)
+
+    # 3 - Evaluation of the entities by batches, with a checkpoint after each batch
+    signature = get_evaluation_signature(path,ent_cat,ban_words_entities,list_isNotFP,list_isNotFN,args)
+    entities_results = load_checkpoint(checkpoint_path,signature) if args.resume else {}
+    remaining = [entity for entity in entities if entity not in entities_results]
+    if len(remaining) < len(entities):
+        print(f"Resumed : {len(entities) - len(remaining)} entities already evaluated")
+    for first in range(0, len(remaining), args.batch_size):
+        batch = remaining[first:first + args.batch_size]
+        df_results, entities_metrics = evaluate_entities(batch,ent_cat,path,df,other_categories,list_isNotFP,list_isNotFN,ban_words_entities,store,df_results,homogeneity_score,workers=args.workers,draw_number=args.draw_number,alpha=args.alpha,seed=args.seed)
+        for entity in batch:
+            entity_results = {
+                'results': df_results[df_results['entity'] == entity].iloc[0].to_dict(),
+                'categories': entities_metrics[entity]['metrics'].to_dict('records'),
+            }
+            if args.locations:
+                entity_results['locations'] = entities_metrics[entity]['locations'].to_dict('records')
+            entities_results[entity] = json.loads(json.dumps(entity_results, default=lambda value: value.item()))
+            print(f"{entity} : precision {entity_results['results']['precision']}, recall {entity_results['results']['recall']}")
+        save_checkpoint(checkpoint_path,signature,entities_results)
+
+    # 4 - Results
+    for written in write_results(args.output,args.format,entities,entities_results,args.locations):
+        print("Results written in " + written)
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,10 @@
 from .normalisation import *
+from .bk_tree import *
+from .translation import *
 from .brat import *
+from .store import *
+from .corpus import *
+from .token_index import *
+from .decisions import *
 from .saving import *
 
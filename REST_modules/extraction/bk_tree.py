@@ -0,0 +1,61 @@
+from Levenshtein import distance as lev
+
+def create_bk_tree():
+    """
+    Create an empty BK-tree. The texts of the tree are arranged by their Levenshtein distance to their parent, 
+    so that the texts close to a searched text are found without calculating the distance to all the texts of the tree.
+    
+    Return :
+    (dict) : the empty BK-tree.
+    """
+    return {'root': None, 'size': 0}
+
+def add_bk_tree(tree, text, item=None):
+    """
+    Add a text to the BK-tree.
+    
+    Parameters : 
+    tree (dict) : the BK-tree.
+    text (string) : text added to the tree.
+    item (object) : value associated with the text, returned by the searches.
+    """
+    # node : [text, item, children by distance]
+    node = [text, item, {}]
+    tree['size'] += 1
+    if tree['root'] is None:
+        tree['root'] = node
+        return
+    current = tree['root']
+    while True:
+        distance = lev(text, current[0])
+        if distance not in current[2]:
+            current[2][distance] = node
+            return
+        current = current[2][distance]
+
+def search_bk_tree(tree, text, radius):
+    """
+    Find the texts of the BK-tree whose Levenshtein distance to a text is at most 'radius'.
+    
+    Parameters : 
+    tree (dict) : the BK-tree.
+    text (string) : searched text.
+    radius (int) : maximal distance of the texts found.
+    
+    Return :
+    (list) : list of (distance, text, item) of the texts found. 
+    """
+    found = []
+    if tree['root'] is None or radius < 0:
+        return found
+    nodes = [tree['root']]
+    while nodes:
+        node = nodes.pop()
+        distance = lev(text, node[0])
+        if distance <= radius:
+            found.append((distance, node[0], node[1]))
+        # By the triangle inequality, only the children at a distance in [distance-radius, distance+radius] can be close enough
+        for child_distance, child in node[2].items():
+            if distance - radius <= child_distance <= distance + radius:
+                nodes.append(child)
+    return found
@@ -3,6 +3,11 @@ import random
 import re
 import glob
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import islice
+
+from .saving import load_parse_cache, create_parse_cache_writer, write_parse_cache_document, close_parse_cache_writer
 
 
 REGEX_ENTITY = re.compile('^(T\d+)\t([^\s]+)([^\t]+)\t(.*)$')
@@ -13,23 +18,116 @@ REGEX_EVENT = re.compile('^(E\d+)\t(.+)$')
 REGEX_EVENT_PART = re.compile('([^\s]+):([TE]\d+)')
 
 
-def load_from_brat(path, merge_spaced_fragments=True, merge_all_fragments=False):
+def split_entity_line(line):
     """
-    Load a brat dataset into a Dataset object
-    Parameters
-    ----------
-    path: str or pathlib.Path
-    merge_spaced_fragments: bool
-        Merge fragments of a entity that was splited by brat because it overlapped an end of line
-    merge_all_fragments: bool
-        Merge all fragments into one single fragment 
-    Returns
-    -------
-    Dataset
+    Parse a well-formed entity (T) line of a .ann file with string splits only.
+    
+    Parameters : 
+    line (str) : line of the .ann file.
+    
+    Return :
+    (tuple) : the annotation id, the entity label, the mention text and the sorted (begin, end) fragments.
+              None if the line is not well-formed, so that it can be parsed by "match_entity_line". 
     """
+    fields = line.rstrip('\n').split('\t', 2)
+    if len(fields) != 3 or not fields[0][1:].isdigit():
+        return None
+    entity, _, span = fields[1].partition(' ')
+    if not entity or not span:
+        return None
+    try:
+        if ';' not in span:
+            begin, end = span.split()
+            return fields[0], entity, fields[2], [(int(begin), int(end))]
+        begins_ends = []
+        for fragment in span.split(';'):
+            begin_end = fragment.split()
+            begins_ends.append((int(begin_end[0]), int(begin_end[1])))
+    except (ValueError, IndexError):
+        return None
+    begins_ends.sort()
+    return fields[0], entity, fields[2], begins_ends
 
-    # Extract annotations from path and make multiple dataframe from it
 
+def match_entity_line(line):
+    """
+    Parse an entity (T) line of a .ann file with the regex REGEX_ENTITY.
+    
+    Parameters : 
+    line (str) : line of the .ann file.
+    
+    Return :
+    (tuple) : the annotation id, the entity label, the mention text and the sorted (begin, end) fragments. 
+    """
+    match = REGEX_ENTITY.match(line)
+    if match is None:
+        raise ValueError(f'Unrecognized Brat line {line}')
+    span = match.group(3)
+    begins_ends = sorted([(int(s.split()[0]), int(s.split()[1])) for s in span.split(';')])
+    return match.group(1), match.group(2), match.group(4), begins_ends
+
+
+def split_relation_line(line):
+    """
+    Parse a well-formed relation (R) line of a .ann file with string splits only.
+    
+    Parameters : 
+    line (str) : line of the .ann file.
+    
+    Return :
+    (tuple) : the annotation id, the relation label and the two arguments.
+              None if the line is not well-formed, so that it can be parsed by "match_relation_line". 
+    """
+    fields = line.rstrip('\n').split('\t')
+    if len(fields) < 2 or not fields[0][1:].isdigit():
+        return None
+    parts = fields[1].split(' ')
+    if len(parts) != 3 or not parts[0] or not parts[1].startswith('Arg1:') or not parts[2].startswith('Arg2:') or len(parts[1]) == 5 or len(parts[2]) == 5:
+        return None
+    return fields[0], parts[0], parts[1][5:], parts[2][5:]
+
+
+def match_relation_line(line):
+    """
+    Parse a relation (R) line of a .ann file with the regex REGEX_RELATION.
+    
+    Parameters : 
+    line (str) : line of the .ann file.
+    
+    Return :
+    (tuple) : the annotation id, the relation label and the two arguments. 
+    """
+    match = REGEX_RELATION.match(line)
+    if match is None:
+        raise ValueError(f'Unrecognized Brat line {line}')
+    return match.group(1), match.group(2), match.group(3), match.group(4)
+
+
+def parse_entity_line(line):
+    """
+    Parse an entity (T) line of a .ann file, with the regex only if the line is not well-formed.
+    """
+    return split_entity_line(line) or match_entity_line(line)
+
+
+def parse_relation_line(line):
+    """
+    Parse a relation (R) line of a .ann file, with the regex only if the line is not well-formed.
+    """
+    return split_relation_line(line) or match_relation_line(line)
+
+
+
+def list_brat_files(path):
+    """
+    List the .txt files of a brat dataset, paired with their annotation files.
+    
+    Parameters : 
+    path (str or pathlib.Path) : path of the dataset, or of a single .txt/.ann file.
+    
+    Return :
+    (dict) : dictionnary of each document relative name and its "txt" file and "ann" files. 
+    """
     root_path = path
     path = str(path)
     if os.path.isdir(path):
@@ -44,209 +142,356 @@ def load_from_brat(path, merge_spaced_fragments=True, merge_all_fragments=False)
     filenames = {os.path.relpath(filename, root_path).rsplit(".", 1)[0]: {"txt": filename, "ann": []} for filename in glob.glob(path, recursive=True)}
     for filename in glob.glob(path.replace(".txt", ".a*"), recursive=True):
         filenames[os.path.relpath(filename, root_path).rsplit(".", 1)[0]]["ann"].append(filename)
-    for doc_id, files in filenames.items():
-        entities = {}
-        relations = []
-        events = {}
-        
-        doc_id = filename.replace('.txt', '').split("/")[-1]
-        #doc_id = "JIODAO"
-        
-        ann_doc_name = files["ann"][0] if files["ann"] else None  # Prendre le premier fichier .ann trouvé ou None s'il n'y en a pas
-        ann_doc_name = os.path.basename(ann_doc_name) if ann_doc_name else None
-        ann_doc_name = os.path.splitext(ann_doc_name)[0]
-        
-        with open(files["txt"], encoding="utf-8") as f:
-            text = f.read()
-
-        if not len(files["ann"]):
-            yield {
-                "doc_id": doc_id,
-                "text": text,
-            }
-            continue
-
-        for ann_file in files["ann"]:
-            with open(ann_file, "r", encoding="utf-8") as f:
-                for line_idx, line in enumerate(f):
-                    try:
-                        if line.startswith('T'):
-                            match = REGEX_ENTITY.match(line)
-                            if match is None:
-                                raise ValueError(f'File {ann_file}, unrecognized Brat line {line}')
-                            ann_id = match.group(1)
-                            entity = match.group(2)
-                            span = match.group(3)
-                            mention_text = match.group(4)
-                            entities[ann_id] = {
-                                "text": mention_text,
-                                "entity_id": ann_id,
-                                "fragments": [],
-                                "attributes": [],
-                                "comments": [],
-                                "label": entity,
-                            }
-                            last_end = None
-                            fragment_i = 0
-                            begins_ends = sorted([(int(s.split()[0]), int(s.split()[1])) for s in span.split(';')])
-
-                            for begin, end in begins_ends:
-                                # If merge_spaced_fragments, merge two fragments that are only separated by a newline (brat automatically creates
-                                # multiple fragments for a entity that spans over more than one line)
-                                if merge_spaced_fragments and last_end is not None and len(text[last_end:begin].strip()) == 0:
-                                    entities[ann_id]["fragments"][-1]["end"] = end
-                                    continue
-                                entities[ann_id]["fragments"].append({
-                                    "begin": begin,
-                                    "end": end,
-                                })
-                                fragment_i += 1
-                                last_end = end
-                        elif line.startswith('A') or line.startswith('M'):
-                            match = REGEX_ATTRIBUTE.match(line)
-                            if match is None:
-                                raise ValueError(f'File {ann_file}, unrecognized Brat line {line}')
-                            ann_id = match.group(1)
-                            parts = match.group(2).split(" ")
-                            if len(parts) >= 3:
-                                entity, entity_id, value = parts
-                            elif len(parts) == 2:
-                                entity, entity_id = parts
-                                value = None
-                            else:
-                                raise ValueError(f'File {ann_file}, unrecognized Brat line {line}')
-                            (entities[entity_id] if entity_id.startswith('T') else events[entity_id])["attributes"].append({
-                                "attribute_id": ann_id,
-                                "label": entity,
-                                "value": value,
-                            })
-                        elif line.startswith('R'):
-                            match = REGEX_RELATION.match(line)
-                            if match is None:
-                                raise ValueError(f'File {ann_file}, unrecognized Brat line {line}')
-                            ann_id = match.group(1)
-                            ann_name = match.group(2)
-                            arg1 = match.group(3)
-                            arg2 = match.group(4)
-                            relations.append({
-                                "relation_id": ann_id,
-                                "relation_label": ann_name,
-                                "from_entity_id": arg1,
-                                "to_entity_id": arg2,
-                            })
-                        elif line.startswith('E'):
-                            match = REGEX_EVENT.match(line)
-                            if match is None:
-                                raise ValueError(f'File {ann_file}, unrecognized Brat line {line}')
-                            ann_id = match.group(1)
-                            arguments_txt = match.group(2)
-                            arguments = []
-                            for argument in REGEX_EVENT_PART.finditer(arguments_txt):
-                                arguments.append({"entity_id": argument.group(2), "label": argument.group(1)})
-                            events[ann_id] = {
-                                "event_id": ann_id,
-                                "attributes": [],
-                                "arguments": arguments,
-                            }
-                        elif line.startswith('#'):
-                            match = REGEX_NOTE.match(line)
-                            if match is None:
-                                raise ValueError(f'File {ann_file}, unrecognized Brat line {line}')
-                            ann_id = match.group(1)
-                            entity_id = match.group(2)
-                            comment = match.group(3)
-                            entities[entity_id]["comments"].append({
-                                "comment_id": ann_id,
-                                "comment": comment,
-                            })
-                    except:
-                        raise Exception("Could not parse line {} from {}: {}".format(line_idx, filename.replace(".txt", ".ann"), repr(line)))
-        if merge_all_fragments:
-            merged_entities = []
-            for entity in entities.values():
-                fragments = entity['fragments']
-                if len(fragments) == 1:
-                    merged_entities.append(entity)
-                else:
-                    begin = fragments[0]['begin']
-                    end = fragments[-1]['end']
-                    entity['text'] = text[begin:end].replace('\n', ' ')
-                    entity['fragments'] = [{
-                        'begin': begin,
-                        'end': end
-                    }]
-                    merged_entities.append(entity)
-            entities = merged_entities
-        else:
-            entities = list(entities.values())
-        yield {
-            "num_ann": ann_doc_name, 
+    return filenames
+
+
+def parse_brat_document(files, merge_spaced_fragments=True, merge_all_fragments=False):
+    """
+    Parse one brat document (a .txt file and its .ann files).
+    Defined at module level so it can be sent to the worker processes of "load_from_brat".
+    
+    Parameters : 
+    files (dict) : "txt" file and "ann" files of the document, as returned by "list_brat_files".
+    merge_spaced_fragments (bool) : merge fragments of a entity that was splited by brat because it overlapped an end of line.
+    merge_all_fragments (bool) : merge all fragments into one single fragment.
+    
+    Return :
+    (dict) : the document, its text, entities, relations and events. 
+    """
+    doc_id = os.path.basename(files["txt"]).rsplit(".", 1)[0]
+
+    with open(files["txt"], encoding="utf-8") as f:
+        text = f.read()
+
+    if not len(files["ann"]):
+        return {
             "doc_id": doc_id,
             "text": text,
-            "entities": entities,
-            "relations": relations,
-            "events": list(events.values()),
         }
 
+    ann_doc_name = os.path.splitext(os.path.basename(files["ann"][0]))[0]  # Prendre le premier fichier .ann trouvé
+    entities = {}
+    relations = []
+    events = {}
 
-def export_to_brat(samples, filename_prefix="", overwrite_txt=False, overwrite_ann=False):
+    for ann_file in files["ann"]:
+        with open(ann_file, "r", encoding="utf-8") as f:
+            for line_idx, line in enumerate(f):
+                try:
+                    if line.startswith('T'):
+                        ann_id, entity, mention_text, begins_ends = parse_entity_line(line)
+                        entities[ann_id] = {
+                            "text": mention_text,
+                            "entity_id": ann_id,
+                            "fragments": [],
+                            "attributes": [],
+                            "comments": [],
+                            "label": entity,
+                        }
+                        last_end = None
+                        fragment_i = 0
+
+                        for begin, end in begins_ends:
+                            # If merge_spaced_fragments, merge two fragments that are only separated by a newline (brat automatically creates
+                            # multiple fragments for a entity that spans over more than one line)
+                            if merge_spaced_fragments and last_end is not None and len(text[last_end:begin].strip()) == 0:
+                                entities[ann_id]["fragments"][-1]["end"] = end
+                                continue
+                            entities[ann_id]["fragments"].append({
+                                "begin": begin,
+                                "end": end,
+                            })
+                            fragment_i += 1
+                            last_end = end
+                    elif line.startswith('A') or line.startswith('M'):
+                        match = REGEX_ATTRIBUTE.match(line)
+                        if match is None:
+                            raise ValueError(f'File {ann_file}, unrecognized Brat line {line}')
+                        ann_id = match.group(1)
+                        parts = match.group(2).split(" ")
+                        if len(parts) >= 3:
+                            entity, entity_id, value = parts
+                        elif len(parts) == 2:
+                            entity, entity_id = parts
+                            value = None
+                        else:
+                            raise ValueError(f'File {ann_file}, unrecognized Brat line {line}')
+                        (entities[entity_id] if entity_id.startswith('T') else events[entity_id])["attributes"].append({
+                            "attribute_id": ann_id,
+                            "label": entity,
+                            "value": value,
+                        })
+                    elif line.startswith('R'):
+                        ann_id, ann_name, arg1, arg2 = parse_relation_line(line)
+                        relations.append({
+                            "relation_id": ann_id,
+                            "relation_label": ann_name,
+                            "from_entity_id": arg1,
+                            "to_entity_id": arg2,
+                        })
+                    elif line.startswith('E'):
+                        match = REGEX_EVENT.match(line)
+                        if match is None:
+                            raise ValueError(f'File {ann_file}, unrecognized Brat line {line}')
+                        ann_id = match.group(1)
+                        arguments_txt = match.group(2)
+                        arguments = []
+                        for argument in REGEX_EVENT_PART.finditer(arguments_txt):
+                            arguments.append({"entity_id": argument.group(2), "label": argument.group(1)})
+                        events[ann_id] = {
+                            "event_id": ann_id,
+                            "attributes": [],
+                            "arguments": arguments,
+                        }
+                    elif line.startswith('#'):
+                        match = REGEX_NOTE.match(line)
+                        if match is None:
+                            raise ValueError(f'File {ann_file}, unrecognized Brat line {line}')
+                        ann_id = match.group(1)
+                        entity_id = match.group(2)
+                        comment = match.group(3)
+                        entities[entity_id]["comments"].append({
+                            "comment_id": ann_id,
+                            "comment": comment,
+                        })
+                except:
+                    raise Exception("Could not parse line {} from {}: {}".format(line_idx, ann_file, repr(line)))
+    if merge_all_fragments:
+        merged_entities = []
+        for entity in entities.values():
+            fragments = entity['fragments']
+            if len(fragments) == 1:
+                merged_entities.append(entity)
+            else:
+                begin = fragments[0]['begin']
+                end = fragments[-1]['end']
+                entity['text'] = text[begin:end].replace('\n', ' ')
+                entity['fragments'] = [{
+                    'begin': begin,
+                    'end': end
+                }]
+                merged_entities.append(entity)
+        entities = merged_entities
+    else:
+        entities = list(entities.values())
+    return {
+        "num_ann": ann_doc_name, 
+        "doc_id": doc_id,
+        "text": text,
+        "entities": entities,
+        "relations": relations,
+        "events": list(events.values()),
+    }
+
+
+def get_files_signature(files):
+    """
+    Return the signature (path, size and modification time) of the files of a brat document, used to detect changed documents.
+    
+    Parameters : 
+    files (dict) : "txt" file and "ann" files of the document, as returned by "list_brat_files".
+    
+    Return :
+    (tuple) : signature of the document files. 
+    """
+    signature = []
+    for filename in [files["txt"]] + sorted(files["ann"]):
+        stat = os.stat(filename)
+        signature.append((filename, stat.st_size, stat.st_mtime_ns))
+    return tuple(signature)
+
+
+def parse_brat_documents(parse, files_list, workers=None):
+    """
+    Parse the brat documents in order, sequentially or across a pool of worker processes.
+    
+    Parameters : 
+    parse (function) : function parsing one document.
+    files_list (list) : "txt" file and "ann" files of each document, as returned by "list_brat_files".
+    workers (int) : number of worker processes, None to parse the documents sequentially.
+    
+    Return :
+    (generator) : the parsed documents, in the order of "files_list". 
+    """
+    files_list = list(files_list)
+    if not workers or workers <= 1 or len(files_list) <= 1:
+        for files in files_list:
+            yield parse(files)
+        return
+
+    chunksize = max(1, len(files_list) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(parse, files_list, chunksize=chunksize)
+
+
+def load_from_brat(path, merge_spaced_fragments=True, merge_all_fragments=False, workers=None, cache=False):
+    """
+    Load a brat dataset into a Dataset object
+    Parameters
+    ----------
+    path: str or pathlib.Path
+    merge_spaced_fragments: bool
+        Merge fragments of a entity that was splited by brat because it overlapped an end of line
+    merge_all_fragments: bool
+        Merge all fragments into one single fragment 
+    workers: int or None
+        Number of worker processes used to parse the documents. The documents are
+        still yielded in the same order as the sequential parse.
+    cache: bool
+        Keep the annotations of the parsed documents (without their text) in "REST_parse_cache.pickle" in the corpus directory,
+        and only parse again the documents whose files are new or changed since the last load. Disabled by default.
+    Returns
+    -------
+    Dataset
+    """
+
+    # Extract annotations from path and make multiple dataframe from it
+    filenames = list_brat_files(path)
+    parse = partial(parse_brat_document, merge_spaced_fragments=merge_spaced_fragments, merge_all_fragments=merge_all_fragments)
+
+    if not cache or not os.path.isdir(str(path)):
+        yield from parse_brat_documents(parse, filenames.values(), workers)
+        return
+
+    options = (merge_spaced_fragments, merge_all_fragments)
+    cached_documents = load_parse_cache(str(path), options)
+    signatures = {name: get_files_signature(files) for name, files in filenames.items()}
+    changed = [name for name in filenames if name not in cached_documents or cached_documents[name]["signature"] != signatures[name]]
+    parsed_documents = parse_brat_documents(parse, [filenames[name] for name in changed], workers)
+
+    # The cache is written document by document, and only replaces the previous one once all the documents are loaded
+    changed = set(changed)
+    update = bool(changed) or len(filenames) != len(cached_documents)
+    writer = create_parse_cache_writer(str(path), options) if update else None
+    complete = False
+    try:
+        for name in filenames:
+            if name in changed:
+                doc = next(parsed_documents)
+            else:
+                # the text is not cached, it is read again from the .txt file
+                with open(filenames[name]["txt"], encoding="utf-8") as f:
+                    doc = dict(cached_documents.pop(name)["doc"], text=f.read())
+            if writer is not None:
+                write_parse_cache_document(writer, name, signatures[name], doc)
+            yield doc
+        complete = True
+    finally:
+        if writer is not None:
+            close_parse_cache_writer(writer, complete)
+
+def format_brat_ann(doc):
+    """
+    Build the content of the .ann file of a document in memory.
+    
+    Parameters : 
+    doc (dict) : document with its text, and possibly its entities and relations.
+    
+    Return :
+    (str) : content of the .ann file, one line per entity, attribute and relation. 
+    """
+    lines = []
+    attribute_idx = 1
+    entities_ids = defaultdict(lambda: "T" + str(len(entities_ids) + 1))
+    if "entities" in doc:
+        for entity in doc["entities"]:
+            idx = None
+            spans = []
+            brat_entity_id = entities_ids[entity["entity_id"]]
+            entity_text = []
+            for fragment in sorted(entity["fragments"], key=lambda frag: frag["begin"]):
+                idx = fragment["begin"]
+                frag_text = doc["text"][fragment["begin"]:fragment["end"]]
+                entity_text.append(frag_text)
+                for part in frag_text.split("\n"):
+                    begin = idx
+                    end = idx + len(part)
+                    idx = end + 1
+                    if begin != end:
+                        spans.append((begin, end))
+            lines.append("{}\t{} {}\t{}\n".format(
+                brat_entity_id,
+                str(entity["label"]),
+                ";".join(" ".join(map(str, span)) for span in spans),
+                ' '.join(entity_text).replace("\n", " ")))
+            if "attributes" in entity:
+                for i, attribute in enumerate(entity["attributes"]):
+                    if "value" in attribute and attribute["value"] is not None:
+                        lines.append("A{}\t{} {} {}\n".format(
+                            attribute_idx,
+                            str(attribute["label"]),
+                            brat_entity_id,
+                            attribute["value"]))
+                    else:
+                        lines.append("A{}\t{} {}\n".format(
+                            attribute_idx,
+                            str(attribute["label"]),
+                            brat_entity_id))
+                    attribute_idx += 1
+    if "relations" in doc:
+        for i, relation in enumerate(doc["relations"]):
+            entity_from = entities_ids[relation["from_entity_id"]]
+            entity_to = entities_ids[relation["to_entity_id"]]
+            lines.append("R{}\t{} Arg1:{} Arg2:{}\t\n".format(
+                i + 1,
+                str(relation["label"]),
+                entity_from,
+                entity_to))
+    return "".join(lines)
+
+
+def write_brat_document(doc, filename_prefix="", overwrite_txt=False, overwrite_ann=False):
+    """
+    Write the .txt and .ann files of a document, each file in a single write call.
+    Defined at module level so it can be sent to the worker processes of "export_to_brat".
+    
+    Parameters : 
+    doc (dict) : document with its text, and possibly its entities and relations.
+    filename_prefix (str) : directory where the files are written.
+    overwrite_txt (bool) : overwrite the .txt file if it already exists.
+    overwrite_ann (bool) : overwrite the .ann file if it already exists.
+    """
+    txt_filename = os.path.join(filename_prefix, doc["doc_id"] + ".txt")
+    if not os.path.exists(txt_filename) or overwrite_txt:
+        with open(txt_filename, "w") as f:
+            f.write(doc["text"])
+
+    ann_filename = os.path.join(filename_prefix, doc["doc_id"] + ".ann")
+    if not os.path.exists(ann_filename) or overwrite_ann:
+        content = format_brat_ann(doc)
+        with open(ann_filename, "w") as f:
+            f.write(content)
+
+
+def export_to_brat(samples, filename_prefix="", overwrite_txt=False, overwrite_ann=False, workers=None):
+    """
+    Export documents to a brat dataset.
+    
+    Parameters : 
+    samples (iterable) : any iterator of documents, consumed lazily.
+    filename_prefix (str) : directory where the files are written.
+    overwrite_txt (bool) : overwrite the .txt files that already exist.
+    overwrite_ann (bool) : overwrite the .ann files that already exist.
+    workers (int) : number of worker processes writing the documents, None to write them sequentially.
+    """
     if filename_prefix:
         try:
             os.mkdir(filename_prefix)
         except FileExistsError:
             pass
-    for doc in samples:
-        txt_filename = os.path.join(filename_prefix, doc["doc_id"] + ".txt")
-        if not os.path.exists(txt_filename) or overwrite_txt:
-            with open(txt_filename, "w") as f:
-                f.write(doc["text"])
-
-        ann_filename = os.path.join(filename_prefix, doc["doc_id"] + ".ann")
-        attribute_idx = 1
-        entities_ids = defaultdict(lambda: "T" + str(len(entities_ids) + 1))
-        if not os.path.exists(ann_filename) or overwrite_ann:
-            with open(ann_filename, "w") as f:
-                if "entities" in doc:
-                    for entity in doc["entities"]:
-                        idx = None
-                        spans = []
-                        brat_entity_id = entities_ids[entity["entity_id"]]
-                        entity_text = []
-                        for fragment in sorted(entity["fragments"], key=lambda frag: frag["begin"]):
-                            idx = fragment["begin"]
-                            frag_text = doc["text"][fragment["begin"]:fragment["end"]]
-                            entity_text.append(frag_text)
-                            for part in frag_text.split("\n"):
-                                begin = idx
-                                end = idx + len(part)
-                                idx = end + 1
-                                if begin != end:
-                                    spans.append((begin, end))
-                        print("{}\t{} {}\t{}".format(
-                            brat_entity_id,
-                            str(entity["label"]),
-                            ";".join(" ".join(map(str, span)) for span in spans),
-                            ' '.join(entity_text).replace("\n", " ")), file=f)
-                        if "attributes" in entity:
-                            for i, attribute in enumerate(entity["attributes"]):
-                                if "value" in attribute and attribute["value"] is not None:
-                                    print("A{}\t{} {} {}".format(
-                                        attribute_idx,
-                                        str(attribute["label"]),
-                                        brat_entity_id,
-                                        attribute["value"]), file=f)
-                                else:
-                                    print("A{}\t{} {}".format(
-                                        attribute_idx,
-                                        str(attribute["label"]),
-                                        brat_entity_id), file=f)
-                                attribute_idx += 1
-                if "relations" in doc:
-                    for i, relation in enumerate(doc["relations"]):
-                        entity_from = entities_ids[relation["from_entity_id"]]
-                        entity_to = entities_ids[relation["to_entity_id"]]
-                        print("R{}\t{} Arg1:{} Arg2:{}\t".format(
-                            i + 1,
-                            str(relation["label"]),
-                            entity_from,
-                            entity_to), file=f)
\ No newline at end of file
+    write = partial(write_brat_document, filename_prefix=filename_prefix, overwrite_txt=overwrite_txt, overwrite_ann=overwrite_ann)
+
+    if not workers or workers <= 1:
+        for doc in samples:
+            write(doc)
+        return
+
+    # Documents are sent to the pool by batches, so that the iterator is never fully loaded in memory
+    samples = iter(samples)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        while True:
+            batch = list(islice(samples, workers * 64))
+            if not batch:
+                break
+            for _ in executor.map(write, batch, chunksize=16):
+                pass
@@ -0,0 +1,174 @@
+import os
+import json
+import mmap
+
+CORPUS_STORE_VERSION = 1
+
+# Corpus stores already opened in this process, by corpus path
+corpus_stores = {}
+
+def get_txt_signatures(path):
+    """
+    Return the signature (size and modification time) of each .txt file of the corpus directory.
+
+    Parameters :
+    path (string) : string containing the dataset path.
+
+    Return :
+    (list) : list of [file name, size, modification time] of the .txt files, in the order of "os.listdir".
+    """
+    signatures = []
+    for file_name in os.listdir(path):
+        if file_name.endswith(".txt"):
+            stat = os.stat(os.path.join(path, file_name))
+            signatures.append([file_name, stat.st_size, stat.st_mtime_ns])
+    return signatures
+
+def build_corpus_store(path):
+    """
+    Build the corpus store of the .txt files of the corpus directory, if it is missing or if a .txt file changed (the store already opened in this process is then closed):
+    -'REST_corpus.bin' contains the lowercased texts of all the files, concatenated and encoded in utf-8.
+    -'REST_corpus.json' is the manifest of the documents, with the offsets of each text in 'REST_corpus.bin'.
+    The store is then opened (memory-mapped) and registered for this process.
+
+    Parameters :
+    path (string) : string containing the dataset path.
+
+    Return :
+    (dict) : the opened corpus store.
+    """
+    manifest_path = os.path.join(path, 'REST_corpus.json')
+    signatures = get_txt_signatures(path)
+    corpus = corpus_stores.get(os.path.abspath(path))
+    if corpus is not None and corpus['signatures'] != signatures:
+        # the store opened in this process maps the texts of a previous load
+        close_corpus_store(path)
+    manifest = None
+    if os.path.isfile(manifest_path):
+        with open(manifest_path, 'r', encoding='utf-8') as file:
+            try:
+                manifest = json.load(file)
+            except json.JSONDecodeError:
+                manifest = None
+    if manifest and manifest.get('version') == CORPUS_STORE_VERSION and manifest.get('signatures') == signatures:
+        return open_corpus_store(path)
+
+    close_corpus_store(path)
+    documents = []
+    offset = 0
+    bin_path = os.path.join(path, 'REST_corpus.bin')
+    with open(bin_path + '.tmp', 'wb') as store_file:
+        for file_name, size, mtime in signatures:
+            with open(os.path.join(path, file_name), 'r', newline='', encoding='utf-8') as file:
+                data = file.read().lower().encode('utf-8')
+            store_file.write(data)
+            documents.append([file_name, offset, offset + len(data)])
+            offset += len(data)
+    os.replace(bin_path + '.tmp', bin_path)
+
+    manifest = {'version': CORPUS_STORE_VERSION, 'signatures': signatures, 'documents': documents}
+    with open(manifest_path, 'w', encoding='utf-8') as file:
+        json.dump(manifest, file, ensure_ascii=False)
+    return open_corpus_store(path)
+
+def open_corpus_store(path):
+    """
+    Open (memory-map) an existing corpus store, without copying it. Used by the worker processes to attach to the store built at load time.
+
+    Parameters :
+    path (string) : string containing the dataset path.
+
+    Return :
+    (dict) : the corpus store, with the keys 'signatures' (signatures of the .txt files), 'files' (names of the .txt files), 'offsets' (offsets of each text) and 'data' (memory-mapped texts).
+    """
+    key = os.path.abspath(path)
+    if key in corpus_stores:
+        return corpus_stores[key]
+
+    with open(os.path.join(path, 'REST_corpus.json'), 'r', encoding='utf-8') as file:
+        manifest = json.load(file)
+    data = b""
+    with open(os.path.join(path, 'REST_corpus.bin'), 'rb') as file:
+        if os.fstat(file.fileno()).st_size:
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    corpus = {
+        'signatures': manifest['signatures'],
+        'files': [document[0] for document in manifest['documents']],
+        'offsets': {document[0]: (document[1], document[2]) for document in manifest['documents']},
+        'data': data,
+    }
+    corpus_stores[key] = corpus
+    return corpus
+
+def close_corpus_store(path):
+    """
+    Close the corpus store of a corpus directory, if it is opened in this process.
+
+    Parameters :
+    path (string) : string containing the dataset path.
+    """
+    corpus = corpus_stores.pop(os.path.abspath(path), None)
+    if corpus is not None and isinstance(corpus['data'], mmap.mmap):
+        corpus['data'].close()
+
+def get_corpus_store(path):
+    """
+    Return the corpus store of a corpus directory, building it if necessary.
+
+    Parameters :
+    path (string) : string containing the dataset path.
+
+    Return :
+    (dict) : the opened corpus store.
+    """
+    key = os.path.abspath(path)
+    if key in corpus_stores:
+        return corpus_stores[key]
+    if os.path.isfile(os.path.join(path, 'REST_corpus.json')) and os.path.isfile(os.path.join(path, 'REST_corpus.bin')):
+        try:
+            return open_corpus_store(path)
+        except (json.JSONDecodeError, KeyError, ValueError):
+            pass
+    return build_corpus_store(path)
+
+def get_corpus_files(path):
+    """
+    Return the names of the .txt files of the corpus.
+
+    Parameters :
+    path (string) : string containing the dataset path, None if no corpus is loaded.
+
+    Return :
+    (list) : names of the .txt files.
+    """
+    if not path:
+        return []
+    return get_corpus_store(path)['files']
+
+def get_corpus_text(path, file_name):
+    """
+    Return the lowercased text of a .txt file of the corpus, read from the corpus store.
+
+    Parameters :
+    path (string) : string containing the dataset path.
+    file_name (string) : name of the .txt file.
+
+    Return :
+    (string) : the lowercased text.
+    """
+    corpus = get_corpus_store(path)
+    start, end = corpus['offsets'][file_name]
+    return corpus['data'][start:end].decode('utf-8')
+
+def iter_corpus_texts(path):
+    """
+    Iterate over the lowercased texts of the corpus, read from the corpus store.
+
+    Parameters :
+    path (string) : string containing the dataset path, None if no corpus is loaded.
+
+    Return :
+    (generator) : (file name, lowercased text) of each .txt file.
+    """
+    for file_name in get_corpus_files(path):
+        yield file_name, get_corpus_text(path, file_name)
@@ -0,0 +1,98 @@
+def create_decisions_index():
+    """
+    Create an empty index of reviewer decisions (FP considered as TP, or FN disregarded).
+    The decisions are kept in a dictionnary of each location (category, file, start, end) and its motif (FP) or annotation (FN),
+    so that a location is checked without scanning all the decisions.
+
+    Return :
+    (dict) : the empty index.
+    """
+    return {}
+
+def get_decision_key(category, file_name, places):
+    """
+    Return the key of a location in the index of reviewer decisions.
+
+    Parameters :
+    category (string) : the category, without brackets.
+    file_name (string) : name of the .txt file.
+    places (list) : [start, end] of the location.
+
+    Return :
+    (tuple) : the key (category, file, start, end).
+    """
+    return (category, file_name, int(places[0]), int(places[1]))
+
+def add_decision(index, category, file_name, places, value):
+    """
+    Add a reviewer decision to the index.
+
+    Parameters :
+    index (dict) : the index of reviewer decisions.
+    category (string) : the category, without brackets.
+    file_name (string) : name of the .txt file.
+    places (list) : [start, end] of the location.
+    value (string) : the motif of the location (FP), or its annotation (FN).
+    """
+    index[get_decision_key(category, file_name, places)] = value
+
+def remove_decision(index, category, file_name, places):
+    """
+    Remove a reviewer decision from the index.
+
+    Parameters :
+    index (dict) : the index of reviewer decisions.
+    category (string) : the category, without brackets.
+    file_name (string) : name of the .txt file.
+    places (list) : [start, end] of the location.
+    """
+    index.pop(get_decision_key(category, file_name, places), None)
+
+def has_decision(index, category, file_name, places, value):
+    """
+    Check if there is a reviewer decision for a location.
+
+    Parameters :
+    index (dict) : the index of reviewer decisions.
+    category (string) : the category, without brackets.
+    file_name (string) : name of the .txt file.
+    places (list) : [start, end] of the location.
+    value (string) : the motif of the location (FP), or its annotation (FN).
+
+    Return :
+    (bool) : True if the decision exists for the location, with the same motif or annotation.
+    """
+    return index.get(get_decision_key(category, file_name, places)) == value
+
+def serialize_decisions(index):
+    """
+    Convert the index of reviewer decisions to a list that can be saved in json.
+
+    Parameters :
+    index (dict) : the index of reviewer decisions.
+
+    Return :
+    (list) : list of [category, file, start, end, motif or annotation].
+    """
+    return [[category, file_name, start, end, value] for (category, file_name, start, end), value in index.items()]
+
+def load_decisions(entries):
+    """
+    Build the index of reviewer decisions from its saved list. The lists saved by the previous versions, with 9 elements per decision
+    ([category, result, isNotFP, isNotFN, text, file, places, annotation, motif]), are migrated.
+
+    Parameters :
+    entries (list) : the saved decisions.
+
+    Return :
+    (dict) : the index of reviewer decisions.
+    """
+    index = create_decisions_index()
+    for entry in entries or []:
+        if len(entry) == 9:
+            category, result, isNotFP, isNotFN, text, file_name, places, annotation, motif = entry
+            add_decision(index, category, file_name, places, annotation if isNotFN else motif)
+        else:
+            category, file_name, start, end, value = entry
+            add_decision(index, category, file_name, [start, end], value)
+    return index
@@ -1,18 +1,23 @@
 import re
 import json
-import copy
 import glob
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 from nltk.corpus import stopwords
 import spacy
 from nltk.stem.snowball import SnowballStemmer
-#from googletrans import Translator
 from Levenshtein import distance as lev
 import os
+import numpy as np
+from .store import group_store_rows
+from .bk_tree import create_bk_tree, add_bk_tree, search_bk_tree
+from .translation import translate_texts
 
 stemmer = SnowballStemmer("french")
-#translator = Translator()
 sp=spacy.load("fr_core_news_sm")
+STEMMING_BATCH_SIZE = 256
+# Stems of the words already stemmed (None for the stop words)
+stems_cache = {}
 
 
 def getEnt(ent_cat):
@@ -73,118 +78,165 @@ def print_docs(docs):
             print(ent)
 
 #Main function, that calls others to extract the informations form the docs
-def extract_annotations(docs,need_translation) :
+def extract_annotations(store,need_translation,translation_backend="googletrans",translation_cache=None) :
     """
-    Extract all the desired information from the .ann files (annotations, occurrences, places, text).
+    Extract all the desired information from the annotation store (annotations, occurrences, places, text).
     
     Parameters : 
-    docs (generator) : contains all the informations extracted from the .ann files. 
+    store (dict) : the annotation store built from the .ann files with "build_annotation_store". 
     need_translation (boolean) : specify if the translation to a destination language is necessary.
+    translation_backend (string) : name of the translation backend, see "translate_texts".
+    translation_cache (string) : path of the json translation cache, None to not keep the translations on disk.
     
     Return :
     (dict) : Return a dictionnary containing the annotations, and their associated caracteristics (occurrences, places, text). 
+             The places of an annotation are the array of its rows in the annotation store.
     """
     list_stem = []
-    list_text = {}
     annotations = {}
     
-    # 1) Extraction from docs to a dict, and calculation of occurrences
-    for doc in docs: 
-        for ent in doc['entities']:
-            entity = ent['label'].lower()
-            text = ent['text'].lower()
-            place = [doc['num_ann'],ent['fragments'][0]['begin'],ent['fragments'][0]['end']]
-            if entity not in annotations :
-                annotations[entity]={}
-                annotations[entity]['category?']={}
-            if text not in annotations[entity]['category?']:
-                annotations[entity]['category?'][text]= {"occurrences":1,"stems" :list_stem,"places" : [place]}
-            else : 
-                annotations[entity]['category?'][text]['occurrences']+=1
-                annotations[entity]['category?'][text]['places'].append(place)
+    # 1) Extraction from the store to a dict, and calculation of occurrences
+    for entity, text, rows in group_store_rows(store):
+        if entity not in annotations :
+            annotations[entity]={}
+            annotations[entity]['category?']={}
+        annotations[entity]['category?'][text]= {"occurrences":len(rows),"stems" :list_stem,"places" : rows}
     
-    # 2) Translation to french (if necessary)
-    if need_translation and not load_cantemist :
+    # 2) Translation to french (if necessary), the entities and the texts being translated in a single batch
+    if need_translation :
+        texts = list(annotations.keys()) + [text for entity in annotations for text in annotations[entity]['category?']]
+        translations = dict(zip(texts,translate_texts(texts,src='es',dest='fr',backend=translation_backend,cache_path=translation_cache)))
         temp ={}
         for entity in list(annotations.keys()) :
-            entity_fr=translator.translate(entity,src='es', dest='fr').text
-            temp[entity_fr] = {}
-            temp[entity_fr]['category?'] = {}
+            entity_fr=translations[entity]
+            if entity_fr not in temp :
+                temp[entity_fr] = {}
+                temp[entity_fr]['category?'] = {}
             for text in annotations[entity]['category?'] :
-                text_fr = translator.translate(text,src='es', dest='fr').text
+                text_fr = translations[text]
                 if text_fr in temp[entity_fr]['category?'] :
                     temp[entity_fr]['category?'][text_fr]['occurrences'] += annotations[entity]['category?'][text]['occurrences']
-                    for place in annotations[entity]['category?'][text]['places']:
-                        temp[entity_fr]['category?'][text_fr]['places'].append(place)
+                    temp[entity_fr]['category?'][text_fr]['places'] = np.concatenate((temp[entity_fr]['category?'][text_fr]['places'],annotations[entity]['category?'][text]['places']))
                 else : temp[entity_fr]['category?'][text_fr]=annotations[entity]['category?'][text]
         annotations = temp
     return annotations     
 
 #Stemming of all the texts in the 'annotations' dict
-def stemming(annotations) :
+def get_stop_words():
+    """
+    Return the stop words removed from the stems.
+    
+    Return :
+    (set) : the french stop words and the custom stop words. 
+    """
+    stop_words = set(stopwords.words('french'))
+    stop_words.update([",","(","d'",")","l'","ni","n'","a"] ) #custom stop words
+    return stop_words
+
+def stem_texts(texts,n_process=1,batch_size=STEMMING_BATCH_SIZE):
+    """
+    Calculate the stems of the words of the texts. The texts are only tokenized (the other components of the spacy pipeline are disabled), 
+    by batches, and the stem of each distinct word is only calculated once.
+    
+    Parameters : 
+    texts (list) : texts to stem.
+    n_process (int) : number of processes used by spacy to tokenize the texts.
+    batch_size (int) : number of texts tokenized in a batch.
+    
+    Return :
+    (list) : list of the stems (without stop words) of each text. 
+    """
+    stop_words = get_stop_words()
+    texts_stems = []
+    with sp.select_pipes(disable=sp.pipe_names):
+        for sentence in sp.pipe(texts,n_process=n_process,batch_size=batch_size):
+            stems = []
+            for word in sentence :
+                if word.text not in stems_cache:
+                    stem = stemmer.stem(word.text)
+                    stems_cache[word.text] = stem if stem not in stop_words else None
+                if stems_cache[word.text] is not None:
+                    stems.append(stems_cache[word.text])
+            texts_stems.append(stems)
+    return texts_stems
+
+def stemming(annotations,n_process=1,inplace=False) :
     """
     Calculate the stems for all the annotations, and store them in a dictionnary.
+    The annotations in input are not copied : they are updated if 'inplace' is True, otherwise only the dictionnaries containing the stems are new 
+    (copy-on-write), the places being shared with the annotations in input.
     
     Parameters : 
     annotations (dict) : contains the annotations, and their associated caracteristics (occurrences, places, text). 
+    n_process (int) : number of processes used to tokenize the texts.
+    inplace (bool) : True to add the stems to the annotations in input.
     
     Return :
     (dict) : Return a dictionnary containing the annotations, and their associated caracteristics (occurrences, places, text, stems). 
     """
-    current_annotations = copy.deepcopy(annotations)
-    stop_words = set(stopwords.words('french'))
-    stop_words.update([",","(","d'",")","l'","ni","n'","a"] ) #custom stop words
-    for entity in list(current_annotations.keys()) :
+    texts = list(dict.fromkeys(text for entity in annotations for text in annotations[entity]['category?']))
+    texts_stems = dict(zip(texts,stem_texts(texts,n_process=n_process)))
+    current_annotations = annotations if inplace else {}
+    for entity in list(annotations.keys()) :
+        if not inplace:
+            current_annotations[entity] = {'category?': {text: dict(values) for text, values in annotations[entity]['category?'].items()}}
         for text in current_annotations[entity]['category?']:
-            stems=[]
-            sentence = sp(text)
-            for word in sentence :
-                stem = stemmer.stem(word.text)
-                if stem not in stop_words :
-                    stems.append(stem)
-            current_annotations[entity]['category?'][text]['stems']= stems             
+            current_annotations[entity]['category?'][text]['stems']= list(texts_stems[text])
     return current_annotations  
 
 #Merge all the texts, depending on the Levenshtein distance
-def Levenshtein(annotations1,dist): 
+def Levenshtein(annotations1,dist,inplace=False): 
     """
     Merge the annotations if their levenshtein distance is lower than the choosen distance in input.
+    Each annotation is merged in the first kept annotation (in order of appearance) with the same stems, or with close stems 
+    (when both stems contain no digit and the stems kept are longer than 4 characters). The close stems are searched in a BK-tree of the kept annotations.
+    The annotations in input are not copied : they are replaced by the merged annotations if 'inplace' is True, 
+    otherwise only the kept annotations are copied when they are merged (copy-on-write).
     
     Parameters : 
     annotations1 (dict) : contains the annotations, and their associated caracteristics (occurrences, places, text, stems). 
     dist (int) : threshold distance where annotations with Levenshtein score that are below will merge. 
+    inplace (bool) : True to merge the annotations in input.
     
     Return :
     tempo_annotations (dict) : Return a dictionnary containing the annotations and their associated caracteristics, where similar annotations calculated with levenshtein are merged. 
     levenshtein_results (dict) : Return a dictionnary containing the annotations merged with levenshtein's score. 
     """
-    current_annotations = copy.deepcopy(annotations1)
-    tempo_annotations = {}
+    current_annotations = annotations1
+    tempo_annotations = annotations1 if inplace else {}
     levenshtein_results = {}
     for entity in list(current_annotations.keys()) :
+        texts_annotations = current_annotations[entity]['category?']
         tempo_annotations[entity]= {}
         tempo_annotations[entity]['category?']= {}
-        for text in current_annotations[entity]['category?']:
-            ajout = True
-            stems = " ".join(current_annotations[entity]['category?'][text]['stems']) 
-            for tempo_text in tempo_annotations[entity]['category?'] :
-                tempo_stems = " ".join(tempo_annotations[entity]['category?'][tempo_text]['stems'])
-                dist_leven=lev(stems,tempo_stems)           
-                if (dist_leven<dist and not contain_digit(stems) and not contain_digit(tempo_stems) and len(tempo_stems)>4) or (dist_leven==0):
-                    tempo_annotations[entity]['category?'][tempo_text]['occurrences']+= current_annotations[entity]['category?'][text]['occurrences']
-                    for place in current_annotations[entity]['category?'][text]['places']:
-                        tempo_annotations[entity]['category?'][tempo_text]['places'].append(place)
-                    ajout =False
-                    
-                    #MAJ leven
-                    if dist_leven>0 and (tempo_stems not in levenshtein_results) :
-                        levenshtein_results[tempo_stems] = []
-                        levenshtein_results[tempo_stems].append(stems)
-                    elif dist_leven>0 and (stems not in levenshtein_results[tempo_stems]):
-                        levenshtein_results[tempo_stems].append(stems)
-                    break             
-            if ajout :
-                tempo_annotations[entity]['category?'][text] = current_annotations[entity]['category?'][text] 
+        kept_stems = {} # stems of the kept annotations : (order, text)
+        tree = create_bk_tree() # kept annotations that can be merged with close stems
+        for text in texts_annotations:
+            stems = " ".join(texts_annotations[text]['stems']) 
+            candidates = []
+            if stems in kept_stems:
+                candidates.append((kept_stems[stems][0],0,stems,kept_stems[stems][1]))
+            if not contain_digit(stems):
+                for dist_leven, tempo_stems, (order, tempo_text) in search_bk_tree(tree,stems,dist-1):
+                    candidates.append((order,dist_leven,tempo_stems,tempo_text))
+            if candidates:
+                order, dist_leven, tempo_stems, tempo_text = min(candidates)
+                if not inplace and tempo_annotations[entity]['category?'][tempo_text] is texts_annotations[tempo_text]:
+                    tempo_annotations[entity]['category?'][tempo_text] = dict(texts_annotations[tempo_text])
+                tempo_annotations[entity]['category?'][tempo_text]['occurrences']+= texts_annotations[text]['occurrences']
+                tempo_annotations[entity]['category?'][tempo_text]['places'] = np.concatenate((tempo_annotations[entity]['category?'][tempo_text]['places'],texts_annotations[text]['places']))
+                
+                #MAJ leven
+                if dist_leven>0 and (tempo_stems not in levenshtein_results) :
+                    levenshtein_results[tempo_stems] = []
+                    levenshtein_results[tempo_stems].append(stems)
+                elif dist_leven>0 and (stems not in levenshtein_results[tempo_stems]):
+                    levenshtein_results[tempo_stems].append(stems)
+            else :
+                tempo_annotations[entity]['category?'][text] = texts_annotations[text]
+                kept_stems[stems] = (len(kept_stems),text)
+                if not contain_digit(stems) and len(stems)>4:
+                    add_bk_tree(tree,stems,kept_stems[stems])
     return tempo_annotations,levenshtein_results
     
 def createData(annotations2):
@@ -213,30 +265,64 @@ def createData(annotations2):
                 data.append((entity,category,text,occurrences,stems,places))
     return sorted(data, key=lambda x: x[3], reverse=True), ent_cat  ,ban_words_entities
     
-def get_all_sentences(path):
+def segment_sentences(file_path):
+    """
+    Split the text of a .txt file in sentences, on the periods.
+    
+    Parameters : 
+    file_path (str) : path of the .txt file. 
+    
+    Return :
+    (tuple) : the sentences (each sentence being the list of its lines), the path of the file, and the place (start, end) of each sentence in the text. 
+    """
+    sentences = []
+    places = []
+    with open(file_path, 'r', newline='', encoding='utf-8') as file:
+        text = file.read()
+    start = 0
+    for segment in text.split('.'):
+        end = start + len(segment) + 1  # +1 to include the period
+        sentences.append(segment.split('\n'))
+        places.append((start,end))
+        start = end
+    return sentences, file_path, places
+
+def iter_sentences(path, workers=None):
+    """
+    Iterate lazily over the sentences of the .txt files, file by file. 
+    
+    Parameters : 
+    path (str) : contains the path of the .txt files. 
+    workers (int) : number of worker processes segmenting the files, None to segment them sequentially.
+    
+    Return :
+    (generator) : (sentences, file path, places) of each .txt file, see "segment_sentences". 
+    """
+    txt_files = glob.glob(path+"/*.txt")
+    if not workers or workers <= 1:
+        for file_path in txt_files:
+            yield segment_sentences(file_path)
+        return
+
+    # Files are sent to the pool by batches, so that only the sentences of a batch of files are in memory
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for first in range(0, len(txt_files), workers * 4):
+            yield from executor.map(segment_sentences, txt_files[first:first + workers * 4])
+
+def get_all_sentences(path, workers=None):
     """
     Retrieve all the sentences from the .text files.
     
     Parameters : 
     path (str) : contains the path of the .txt files. 
+    workers (int) : number of worker processes segmenting the files, None to segment them sequentially.
     
     Return :
     (dataframe) : contains all the sentences, and their associated place in the .txt files. 
     """
     all_sentences = []
-    txt_files = glob.glob(path+"/*.txt")
-
-    for file_path in txt_files: 
-        with open(file_path, 'r', newline='', encoding='utf-8') as file:
-            text = file.read()
-            start = 0
-            segments = text.split('.')
-            for segment in segments:
-                end = start + len(segment) + 1  # +1 to include the period
-                phrase = segment.split('\n')
-                all_sentences.append((phrase, file_path, (start,end)))
-                start = end
-            
+    for sentences, file_path, places in iter_sentences(path, workers=workers):
+        all_sentences.extend((sentence, file_path, place) for sentence, place in zip(sentences, places))
     return pd.DataFrame(all_sentences,columns=['text','file','place'])    
 
 def print_annotations_caracteristics(dict_annotations):
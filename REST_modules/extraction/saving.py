@@ -1,6 +1,10 @@
 import json
 import os
+import pickle
 import pandas as pd
+from .decisions import serialize_decisions, load_decisions
+
+PARSE_CACHE_VERSION = 2
 
 def save_progress(path, ent_cat, list_isNotFP, list_isNotFN, ban_words_entities, df_results):
     """
@@ -9,8 +13,8 @@ def save_progress(path, ent_cat, list_isNotFP, list_isNotFN, ban_words_entities,
     Parameters : 
     path (string) : string containing the dataset path. 
     ent_cat (dict) : List of all the entities paired with their categories.
-    list_isNotFP (list) : list of the annotations considered as FP.
-    list_isNotFN (list) : list of the annotations considered as FN.
+    list_isNotFP (dict) : index of the FP considered as TP, saved as a list of [category, file, start, end, motif].
+    list_isNotFN (dict) : index of the FN disregarded, saved as a list of [category, file, start, end, annotation].
     ban_words_entities (dict) : dictionnary of each entity and their related banwords used in the categorization process. 
     df_results (dataframe) : contains the summary of each entity's results (homogeneity,precision,recall).
     
@@ -27,8 +31,8 @@ def save_progress(path, ent_cat, list_isNotFP, list_isNotFN, ban_words_entities,
         data = {}
 
     data['ent_cat'] = ent_cat
-    data['list_isNotFP'] = list_isNotFP
-    data['list_isNotFN'] = list_isNotFN
+    data['list_isNotFP'] = serialize_decisions(list_isNotFP)
+    data['list_isNotFN'] = serialize_decisions(list_isNotFN)
     data['ban_words_entities'] = ban_words_entities
     data['df_results'] = df_results.values.tolist()
     data['df_columns'] = df_results.columns.tolist()
@@ -36,21 +40,23 @@ def save_progress(path, ent_cat, list_isNotFP, list_isNotFN, ban_words_entities,
     with open(json_file_path, 'w', encoding='utf-8') as file:
         json.dump(data, file, ensure_ascii=False, indent=4)
 
-def load_progress(path):
+def load_progress(path, json_file_path=None):
     """
     Load the progress of the user from a json file called "REST_progress.json" in the corpus directory..
     
     Parameters : 
     path (string) : string containing the dataset path. 
+    json_file_path (string) : path of the progress file, None for the "REST_progress.json" of the corpus directory.
     
     Return :
     progress_ent_cat (dict) : List of all the entities paired with their categories.
-    progress_isNotFP : list of the annotations considered as FP.
-    progress_isNotFN : list of the annotations considered as FN.
+    progress_isNotFP : index of the FP considered as TP (the lists saved by the previous versions are migrated, see "load_decisions").
+    progress_isNotFN : index of the FN disregarded.
     progress_ban_words_entities : dictionnary of each entity and their related banwords used in the categorization process.
     progress_df_results : contains the summary of each entity's results (homogeneity,precision,recall).
     """
-    json_file_path = os.path.join(path, 'REST_progress.json')
+    if json_file_path is None:
+        json_file_path = os.path.join(path, 'REST_progress.json')
     progress_ent_cat = None
     progress_isNotFP = None
     progress_isNotFN = None
@@ -62,8 +68,8 @@ def load_progress(path):
             try:
                 data = json.load(file)
                 progress_ent_cat = data.get('ent_cat')
-                progress_isNotFP = data.get('list_isNotFP')
-                progress_isNotFN = data.get('list_isNotFN')
+                progress_isNotFP = load_decisions(data.get('list_isNotFP'))
+                progress_isNotFN = load_decisions(data.get('list_isNotFN'))
                 progress_ban_words_entities = data.get('ban_words_entities')
                 df_results_list = data.get('df_results')
                 df_columns_list = data.get('df_columns')
@@ -73,3 +79,81 @@ def load_progress(path):
                 pass
 
     return progress_ent_cat, progress_isNotFP, progress_isNotFN, progress_ban_words_entities, progress_df_results
+
+def load_parse_cache(path, options):
+    """
+    Load the parsed documents cached by "load_from_brat" in a pickle file called "REST_parse_cache.pickle" in the corpus directory.
+    The cache only contains the annotations of the documents, without their text, see "create_parse_cache_writer".
+    
+    Parameters : 
+    path (string) : string containing the dataset path. 
+    options (tuple) : parsing options the cache was built with. A cache built with other options is ignored.
+    
+    Return :
+    (dict) : dictionnary of each document relative name and its cached "signature" and parsed "doc" (without its text).
+    """
+    cache_file_path = os.path.join(path, 'REST_parse_cache.pickle')
+    if not os.path.isfile(cache_file_path):
+        return {}
+    documents = {}
+    try:
+        with open(cache_file_path, 'rb') as file:
+            unpickler = pickle.Unpickler(file)
+            header = unpickler.load()
+            if not isinstance(header, dict) or header.get('version') != PARSE_CACHE_VERSION or header.get('options') != options:
+                return {}
+            while True:
+                try:
+                    name, signature, doc = unpickler.load()
+                except EOFError:
+                    break
+                documents[name] = {"signature": signature, "doc": doc}
+    except (pickle.UnpicklingError, EOFError, AttributeError, ValueError, TypeError):
+        return {}
+    return documents
+
+def create_parse_cache_writer(path, options):
+    """
+    Start writing the parse cache of "load_from_brat" in a temporary file. The documents are written one by one as they are parsed
+    (see "write_parse_cache_document"), so that they are not all kept in memory.
+    
+    Parameters : 
+    path (string) : string containing the dataset path. 
+    options (tuple) : parsing options the documents are parsed with.
+    
+    Return :
+    (dict) : the writer, with its 'path' (path of the cache), 'file' (opened temporary file) and 'pickler'.
+    """
+    cache_file_path = os.path.join(path, 'REST_parse_cache.pickle')
+    file = open(cache_file_path + '.tmp', 'wb')
+    pickler = pickle.Pickler(file, protocol=pickle.HIGHEST_PROTOCOL)
+    pickler.dump({'version': PARSE_CACHE_VERSION, 'options': options})
+    return {'path': cache_file_path, 'file': file, 'pickler': pickler}
+
+def write_parse_cache_document(writer, name, signature, doc):
+    """
+    Write a parsed document in the parse cache, without its text, which is read again from the .txt file when the cache is used.
+    
+    Parameters : 
+    writer (dict) : the writer, see "create_parse_cache_writer".
+    name (string) : relative name of the document.
+    signature (tuple) : signature of the document files.
+    doc (dict) : the parsed document.
+    """
+    writer['pickler'].dump((name, signature, {key: value for key, value in doc.items() if key != "text"}))
+    # the pickler memo would otherwise keep a reference to every written document
+    writer['pickler'].clear_memo()
+
+def close_parse_cache_writer(writer, keep):
+    """
+    Close the parse cache being written, and replace the previous cache with it.
+    
+    Parameters : 
+    writer (dict) : the writer, see "create_parse_cache_writer".
+    keep (bool) : True to replace the previous cache, False to discard the written cache (documents unchanged, or interrupted load).
+    """
+    writer['file'].close()
+    if keep:
+        os.replace(writer['path'] + '.tmp', writer['path'])
+    else:
+        os.remove(writer['path'] + '.tmp')
@@ -0,0 +1,127 @@
+import numpy as np
+
+
+def build_annotation_store(docs):
+    """
+    Build the columnar annotation store from the documents extracted from the .ann files.
+    Each annotation is one row of the store : its document, begin, end, label and text are kept in NumPy arrays,
+    the documents names, labels and texts being interned in tables shared by all the rows.
+
+    Parameters :
+    docs (generator) : contains all the informations extracted from the .ann files.
+
+    Return :
+    (dict) : the annotation store, with the following keys :
+        -'doc_id', 'begin', 'end', 'label_id', 'text_id' : arrays of the rows (one row per annotation).
+        -'docs', 'labels', 'texts' : tables of the documents names, lowercased labels and lowercased texts.
+        -'doc_offsets' : array of the first row of each document (the rows of a document are contiguous).
+        -'docs_index' : dictionnary of each .txt file and its document id.
+    """
+    doc_ids, begins, ends, label_ids, text_ids = [], [], [], [], []
+    docs_table, labels_table, texts_table = [], [], []
+    labels_index, texts_index = {}, {}
+    doc_offsets = [0]
+
+    for doc in docs:
+        if 'entities' not in doc:
+            continue
+        doc_id = len(docs_table)
+        docs_table.append(doc['num_ann'])
+        for ent in doc['entities']:
+            label = ent['label'].lower()
+            text = ent['text'].lower()
+            if label not in labels_index:
+                labels_index[label] = len(labels_table)
+                labels_table.append(label)
+            if text not in texts_index:
+                texts_index[text] = len(texts_table)
+                texts_table.append(text)
+            doc_ids.append(doc_id)
+            begins.append(ent['fragments'][0]['begin'])
+            ends.append(ent['fragments'][0]['end'])
+            label_ids.append(labels_index[label])
+            text_ids.append(texts_index[text])
+        doc_offsets.append(len(doc_ids))
+
+    return {
+        "doc_id": np.array(doc_ids, dtype=np.int32),
+        "begin": np.array(begins, dtype=np.int64),
+        "end": np.array(ends, dtype=np.int64),
+        "label_id": np.array(label_ids, dtype=np.int32),
+        "text_id": np.array(text_ids, dtype=np.int32),
+        "docs": docs_table,
+        "labels": labels_table,
+        "texts": texts_table,
+        "doc_offsets": np.array(doc_offsets, dtype=np.int64),
+        "docs_index": {doc + ".txt": doc_id for doc_id, doc in enumerate(docs_table)},
+    }
+
+def group_store_rows(store):
+    """
+    Group the rows of the annotation store by label and text, in the order of their first appearance in the corpus.
+
+    Parameters :
+    store (dict) : the annotation store.
+
+    Return :
+    (list) : list of (label, text, rows) tuples, where rows is the array of the store rows of the (label, text) pair.
+    """
+    if len(store['doc_id']) == 0:
+        return []
+    keys = store['label_id'].astype(np.int64) * len(store['texts']) + store['text_id']
+    unique_keys, first_rows, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    sorted_rows = np.argsort(inverse, kind='stable')
+    bounds = np.cumsum(np.bincount(inverse, minlength=len(unique_keys)))[:-1]
+    groups_rows = np.split(sorted_rows, bounds)
+
+    groups = []
+    for group in np.argsort(first_rows, kind='stable'):
+        rows = groups_rows[group]
+        label = store['labels'][store['label_id'][rows[0]]]
+        text = store['texts'][store['text_id'][rows[0]]]
+        groups.append((label, text, rows))
+    return groups
+
+def get_store_places(store, rows):
+    """
+    Return the places of the given rows of the annotation store.
+
+    Parameters :
+    store (dict) : the annotation store.
+    rows (array) : rows of the store.
+
+    Return :
+    (list) : list of the places [document name, begin, end] of the rows.
+    """
+    docs = store['docs']
+    return [[docs[doc_id], begin, end] for doc_id, begin, end in zip(store['doc_id'][rows].tolist(), store['begin'][rows].tolist(), store['end'][rows].tolist())]
+
+def get_store_document_rows(store, file_name):
+    """
+    Return the rows of the annotation store belonging to a document.
+
+    Parameters :
+    store (dict) : the annotation store.
+    file_name (string) : name of the .txt file of the document.
+
+    Return :
+    (slice) : rows of the document, an empty slice if the document has no annotation.
+    """
+    doc_id = store['docs_index'].get(file_name)
+    if doc_id is None:
+        return slice(0, 0)
+    return slice(store['doc_offsets'][doc_id], store['doc_offsets'][doc_id + 1])
+
+def count_store_rows_by_file(store, rows):
+    """
+    Count the given rows of the annotation store in each document.
+
+    Parameters :
+    store (dict) : the annotation store.
+    rows (array) : rows of the store.
+
+    Return :
+    (dict) : dictionnary of each .txt file and its number of rows.
+    """
+    counts = np.bincount(store['doc_id'][rows], minlength=len(store['docs']))
+    return {store['docs'][doc_id] + ".txt": int(counts[doc_id]) for doc_id in np.flatnonzero(counts)}
@@ -0,0 +1,134 @@
+import os
+import re
+import pickle
+from array import array
+from bisect import bisect_left
+from .corpus import get_corpus_store, get_corpus_text
+
+TOKEN_INDEX_VERSION = 2
+REGEX_TOKEN = re.compile(r'\w+')
+REGEX_SPECIAL_CHARACTERS = re.compile(r'[.^$*+?{}\[\]\\|()]')
+
+# Token indexes already loaded in this process, by corpus path
+token_indexes = {}
+
+def build_token_index(path):
+    """
+    Build the inverted index of the tokens of the corpus, and save it in a pickle file called "REST_token_index.pickle" in the corpus directory.
+    The index is only built again if the corpus store changed since the index was saved.
+    
+    Parameters : 
+    path (string) : string containing the dataset path. 
+    
+    Return :
+    (dict) : the token index, with the keys 'files' (names of the .txt files), 'postings' (dictionnary of each token 
+             and the array of its (document, offset) pairs, flattened) and 'tokens' (the tokens, sorted).
+    """
+    corpus = get_corpus_store(path)
+    index_file_path = os.path.join(path, 'REST_token_index.pickle')
+    if os.path.isfile(index_file_path):
+        try:
+            with open(index_file_path, 'rb') as file:
+                token_index = pickle.load(file)
+            if token_index.get('version') == TOKEN_INDEX_VERSION and token_index.get('signatures') == corpus['signatures']:
+                token_indexes[os.path.abspath(path)] = token_index
+                return token_index
+        except (pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+            pass
+
+    postings = {}
+    for doc_id, file_name in enumerate(corpus['files']):
+        for match in REGEX_TOKEN.finditer(get_corpus_text(path, file_name)):
+            token = match.group()
+            if token not in postings:
+                postings[token] = array('q')
+            postings[token].extend((doc_id, match.start()))
+
+    token_index = {'version': TOKEN_INDEX_VERSION, 'signatures': corpus['signatures'], 'files': corpus['files'], 'postings': postings, 'tokens': sorted(postings)}
+    with open(index_file_path + '.tmp', 'wb') as file:
+        pickle.dump(token_index, file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(index_file_path + '.tmp', index_file_path)
+    token_indexes[os.path.abspath(path)] = token_index
+    return token_index
+
+def get_token_index(path):
+    """
+    Return the token index of the corpus, building or loading it if necessary : the index is only built at the first search of the concordancer.
+    
+    Parameters : 
+    path (string) : string containing the dataset path. 
+    
+    Return :
+    (dict) : the token index.
+    """
+    token_index = token_indexes.get(os.path.abspath(path))
+    if token_index is None or token_index['signatures'] != get_corpus_store(path)['signatures']:
+        token_index = build_token_index(path)
+    return token_index
+
+def is_literal_pattern(pattern):
+    """
+    Check if a searched pattern is a plain word or phrase (no regex special character) whose first token is preceded by a non-word character,
+    so that the tokens of the corpus where it can begin are found in the sorted tokens of the index. 
+    Other patterns can begin inside any token of the corpus, and are searched in the texts instead.
+    
+    Parameters : 
+    pattern (string) : word(s) that are searched in the texts.
+    
+    Return :
+    (bool) : True if the pattern can be resolved from the token index. 
+    """
+    if REGEX_SPECIAL_CHARACTERS.search(pattern):
+        return False
+    first_token = REGEX_TOKEN.search(pattern)
+    return first_token is not None and first_token.start() > 0
+
+def search_token_index(path, pattern):
+    """
+    Find the occurrences of a plain word or phrase in the corpus from the token index. 
+    The occurrences are the same as the ones of "re.finditer(pattern, text)" on the lowercased texts : 
+    the candidates given by the postings of the first token of the pattern are checked against the corpus store.
+    
+    Parameters : 
+    path (string) : string containing the dataset path. 
+    pattern (string) : word(s) that are searched in the texts, see "is_literal_pattern".
+    
+    Return :
+    (list) : (file name, start, end) of each occurrence, by file and position. 
+    """
+    token_index = get_token_index(path)
+    postings = token_index['postings']
+    first_token = REGEX_TOKEN.search(pattern)
+    token = first_token.group()
+    token_start = first_token.start()
+    is_suffix = first_token.end() < len(pattern)  # a non-word character follows the token in the pattern
+
+    # 1 - tokens of the corpus beginning with the first token of the pattern (only the token itself if a non-word character follows it)
+    if is_suffix:
+        candidates = [token] if token in postings else []
+    else:
+        tokens = token_index['tokens']
+        candidates = []
+        for position in range(bisect_left(tokens, token), len(tokens)):
+            if not tokens[position].startswith(token):
+                break
+            candidates.append(tokens[position])
+
+    # 2 - candidate starts of the pattern, by document
+    starts = {}
+    for corpus_token in candidates:
+        places = postings[corpus_token]
+        for i in range(0, len(places), 2):
+            starts.setdefault(places[i], []).append(places[i + 1] - token_start)
+
+    # 3 - verification in the texts, keeping non-overlapping occurrences as re.finditer does
+    occurrences = []
+    for doc_id in sorted(starts):
+        file_name = token_index['files'][doc_id]
+        text = get_corpus_text(path, file_name)
+        last_end = 0
+        for start in sorted(starts[doc_id]):
+            if start >= last_end and text.startswith(pattern, start):
+                occurrences.append((file_name, start, start + len(pattern)))
+                last_end = start + len(pattern)
+    return occurrences
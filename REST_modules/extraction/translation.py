@@ -0,0 +1,117 @@
+import os
+import json
+
+TRANSLATION_CACHE_VERSION = 1
+TRANSLATION_BATCH_SIZE = 100
+
+def googletrans_backend(texts, src, dest):
+    """
+    Translate a batch of texts with googletrans.
+
+    Parameters :
+    texts (list) : texts to translate.
+    src (string) : source language.
+    dest (string) : destination language.
+
+    Return :
+    (list) : the translated texts.
+    """
+    from googletrans import Translator
+    return [translation.text for translation in Translator().translate(texts, src=src, dest=dest)]
+
+def stub_backend(texts, src, dest):
+    """
+    Local translation backend, used offline : the texts are returned unchanged.
+
+    Parameters :
+    texts (list) : texts to translate.
+    src (string) : source language.
+    dest (string) : destination language.
+
+    Return :
+    (list) : the texts.
+    """
+    return list(texts)
+
+# Translation backends, by name : function translating a batch of texts (texts, src, dest)
+translation_backends = {
+    "googletrans": googletrans_backend,
+    "stub": stub_backend,
+}
+
+def register_translation_backend(name, backend):
+    """
+    Register a translation backend.
+
+    Parameters :
+    name (string) : name of the backend.
+    backend (function) : function translating a batch of texts, called with (texts, src, dest) and returning the list of the translated texts.
+    """
+    translation_backends[name] = backend
+
+def load_translation_cache(cache_path):
+    """
+    Load the translation cache, an empty cache if the file is missing or invalid.
+
+    Parameters :
+    cache_path (string) : path of the json translation cache, None to not use a cache on disk.
+
+    Return :
+    (dict) : dictionnary of each backend and languages ("backend:src>dest") and their translations.
+    """
+    if not cache_path or not os.path.isfile(cache_path):
+        return {}
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as file:
+            cache = json.load(file)
+    except json.JSONDecodeError:
+        return {}
+    if cache.get('version') != TRANSLATION_CACHE_VERSION:
+        return {}
+    return cache['translations']
+
+def save_translation_cache(cache_path, translations):
+    """
+    Save the translation cache.
+
+    Parameters :
+    cache_path (string) : path of the json translation cache.
+    translations (dict) : dictionnary of each backend and languages ("backend:src>dest") and their translations.
+    """
+    with open(cache_path + '.tmp', 'w', encoding='utf-8') as file:
+        json.dump({'version': TRANSLATION_CACHE_VERSION, 'translations': translations}, file, ensure_ascii=False)
+    os.replace(cache_path + '.tmp', cache_path)
+
+def translate_texts(texts, src='es', dest='fr', backend="googletrans", cache_path=None, batch_size=TRANSLATION_BATCH_SIZE):
+    """
+    Translate texts by batches. Each distinct text is translated once : the translations are kept in the cache,
+    and only the texts missing from the cache are sent to the backend.
+
+    Parameters :
+    texts (list) : texts to translate.
+    src (string) : source language.
+    dest (string) : destination language.
+    backend (string) : name of the translation backend, see "translation_backends".
+    cache_path (string) : path of the json translation cache, None to not use a cache on disk.
+    batch_size (int) : number of texts sent to the backend at once.
+
+    Return :
+    (list) : the translated texts.
+    """
+    if backend not in translation_backends:
+        raise ValueError("Unknown translation backend : " + str(backend))
+    cache = load_translation_cache(cache_path)
+    translations = cache.setdefault(backend + ":" + src + ">" + dest, {})
+
+    missing = [text for text in dict.fromkeys(texts) if text not in translations]
+    translated = 0
+    try:
+        for first in range(0, len(missing), batch_size):
+            batch = missing[first:first + batch_size]
+            translations.update(zip(batch, translation_backends[backend](batch, src, dest)))
+            translated += len(batch)
+    finally:
+        # the batches already translated are saved even if a later batch fails (quota, network error...)
+        if translated and cache_path:
+            save_translation_cache(cache_path, cache)
+    return [translations[text] for text in texts]
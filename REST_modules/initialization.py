@@ -1,6 +1,10 @@
 import pandas as pd
 import ipywidgets as widgets
+import numpy as np
 from .extraction.normalisation import getCat,getEnt
+from .extraction.store import build_annotation_store
+from .extraction.decisions import create_decisions_index
+from .categorization import build_other_categories
 
 def initialize_globals():
     """
@@ -9,21 +13,23 @@ def initialize_globals():
     Return :
     path                : string containing the dataset path. 
     ent_cat             : dictionnary of the entities and their related categories. 
-    list_isNotFP        : list of the annotations considered as FP.
-    list_isNotFN        : list of the annotations considered as FN.
+    list_isNotFP        : index of the FP considered as TP.
+    list_isNotFN        : index of the FN disregarded.
     ban_words_entities  : dictionnary of the entities and their related ban words.
     df                  : main dataframe containing the annotations, and their associated caracteristics (occurrences, places, text). 
     df_tf_results       : dataframe containg the words and their tfidf score from the annotations for each entity.
     ban_words_tfidf     : dictionnary of each entity and their related ban tfidf word.
     homogeneity_score   : dictionnary of the entity and their related homogeneity score.
     df_results          : dataframe of the results of each entitity's results.
+    store               : annotation store, where the places of the annotations are read.
     """    
     path=None
     ent_cat={'entity1':['category?']}
-    list_isNotFP = []
-    list_isNotFN = []
+    list_isNotFP = create_decisions_index()
+    list_isNotFN = create_decisions_index()
     ban_words_entities={'entity1':["None"]}
-    df=pd.DataFrame([['entity1','category?','text1',1,['stem1'],[['text1',1,5]]]],columns=["entity", "category", "text", "occurrences", "stems", "places"])
+    store = build_annotation_store([{'num_ann':'text1','entities':[{'label':'entity1','text':'text1','fragments':[{'begin':1,'end':5}]}]}])
+    df=pd.DataFrame([['entity1','category?','text1',1,['stem1'],np.array([0])]],columns=["entity", "category", "text", "occurrences", "stems", "places"])
     df_tf_results = pd.DataFrame([['entity1','word1','occurrences1','tfidf1']],columns=['entity','word','occurrences','tfidf'])
     ban_words_tfidf = {'entity1': []}
     homogeneity_score = {'entity1': 0}
@@ -38,9 +44,9 @@ def initialize_globals():
                                        "recall","recall_conf_inter_down",
                                        "recall_conf_inter_up"])
 
-    return path,ent_cat,list_isNotFP,list_isNotFN,ban_words_entities,df,df_tf_results,ban_words_tfidf,homogeneity_score,df_results
+    return path,ent_cat,list_isNotFP,list_isNotFN,ban_words_entities,df,df_tf_results,ban_words_tfidf,homogeneity_score,df_results,store
 
-def initialize_widgets_globals(ent_cat):
+def initialize_widgets_globals(ent_cat,store):
     """
     Initialize and return the globals variables related to widgets.
     
@@ -49,14 +55,14 @@ def initialize_widgets_globals(ent_cat):
     current_category     : string containing the current printed category in the visualization tab. 
     options              : list of the categories printed in the visualization tab.
     list_spacing_regex   : list of the discontinued (spacing) regex that needs to.
-    other_categories     : list of the annotations and their other associated categories.
+    other_categories     : table of the annotations and their other associated categories.
     """    
     value_button_results = False
     current_category='category?'
     current_entity='entity1'
     options = [element.strip("[]") for element in getCat(current_entity,ent_cat)]
     list_spacing_regex=[]  
-    other_categories = []
+    other_categories = build_other_categories(store,[],[],[],[])
     
     return value_button_results,current_category,current_entity,options,list_spacing_regex,other_categories
 
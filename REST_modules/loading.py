@@ -1,30 +1,37 @@
+import os
 from .extraction import *
 from .calculs import *
 from .categorization import create_ban_words_tfidf
 
-def load_data_annotations(file_path):
+def load_data_annotations(file_path,workers=None,levenshtein_distance=None,translation_backend=None,cache=False):
     
     # 1 - Extraction + Stemming of the data
-    docs = load_from_brat(file_path, merge_all_fragments=True) 
-    annotations = extract_annotations(docs,need_translation = False)
-    annotations1 = stemming(annotations)
-    annotations2 = annotations1
+    docs = load_from_brat(file_path, merge_all_fragments=True, workers=workers, cache=cache) 
+    store = build_annotation_store(docs)
+    translation_cache = None
+    if os.path.isdir(file_path):
+        build_corpus_store(file_path)
+        translation_cache = os.path.join(file_path,'REST_translation_cache.json')
+    annotations = extract_annotations(store,need_translation = translation_backend is not None,translation_backend=translation_backend,translation_cache=translation_cache)
+    stemming(annotations,n_process=workers or 1,inplace=True)
+    if levenshtein_distance is not None:
+        Levenshtein(annotations,levenshtein_distance,inplace=True)
     
     # 2 - Initialization of major variables
     path = file_path
-    data,ent_cat,ban_words_entities = createData(annotations2)
+    data,ent_cat,ban_words_entities = createData(annotations)
     df = pd.DataFrame(data, columns=["entity", "category", "text", "occurrences", "stems", "places"])
     df_tf_results = calculate_tfidf(ent_cat,df)
     homogeneity_score = calculate_homogeneity_score(df,ent_cat,10)
     ban_words_tfidf = create_ban_words_tfidf(ent_cat)
     current_entity = getEnt(ent_cat)[0]
 
-    return path,ent_cat,ban_words_entities,df,df_tf_results,homogeneity_score,ban_words_tfidf,current_entity
+    return path,ent_cat,ban_words_entities,df,df_tf_results,homogeneity_score,ban_words_tfidf,current_entity,store
 
 
-def load_json(path,df,homogeneity_score,ent_cat):
+def load_json(path,df,homogeneity_score,ent_cat,json_file_path=None):
 
-    progress_ent_cat, progress_isNotFP, progress_isNotFN, progress_ban_words_entities, progress_df_results = load_progress(path)
+    progress_ent_cat, progress_isNotFP, progress_isNotFN, progress_ban_words_entities, progress_df_results = load_progress(path,json_file_path)
     result = {}
     
     if progress_ent_cat:
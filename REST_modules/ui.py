@@ -2,7 +2,6 @@ from ipyfilechooser import FileChooser
 import math
 import ipywidgets as widgets
 import pandas as pd
-import copy
 import nltk
 from nltk.corpus import stopwords
 import plotly.io as pio
@@ -21,15 +20,28 @@ from .categorization import *
 from .loading import *
 
 # Initialization of global variables
-path,ent_cat,list_isNotFP,list_isNotFN,ban_words_entities,df,df_tf_results,ban_words_tfidf,homogeneity_score,df_results = initialize_globals()
+path,ent_cat,list_isNotFP,list_isNotFN,ban_words_entities,df,df_tf_results,ban_words_tfidf,homogeneity_score,df_results,store = initialize_globals()
 
 # Initialization of widgets and their variables
-value_button_results,current_category,current_entity,options,list_spacing_regex,other_categories = initialize_widgets_globals(ent_cat)
+value_button_results,current_category,current_entity,options,list_spacing_regex,other_categories = initialize_widgets_globals(ent_cat,store)
 button_save,button_selection_entity,t0,t1,t2,t3,button_categorization,button_selection_category,ban_word_tag,space,tabs = initialize_widgets(ent_cat,current_entity,ban_words_entities,options)
 
 # Global outputs
 output_results,output_load,output_t1_visualization_category,output_t2_cat_infos,output_t2_donut,output_t3_TEMP = initialize_outputs()
 
+# Number of worker processes calculating the metrics, None to calculate them in the kernel (see "set_metrics_workers")
+ui_settings = {'metrics_workers': None}
+
+def set_metrics_workers(workers):
+    """
+    Choose the number of worker processes calculating the metrics in the interface, and stop the pool of the previous setting.
+    
+    Parameters : 
+    workers (int) : number of worker processes, None (default) to calculate the metrics in the kernel, without starting processes.
+    """
+    ui_settings['metrics_workers'] = workers
+    close_metrics_executor()
+
 ###########
 # HEADER #
 ##########
@@ -89,8 +101,8 @@ def update_df_result(df_metrics,df,df_metrics_locations):
     df_metrics_locations (dataframe) : contains the locations of each categorized word, and whether they are true positive, false positive or false negative.
     """   
     global df_results
-    Xdf = copy.deepcopy(df[df['entity']==current_entity])
-    bootstrap_results= estimate_confidence_intervals_bootstrap(Xdf,current_entity,df_metrics_locations,draw_number=1000, alpha=5.0)
+    Xdf = df[df['entity']==current_entity]
+    bootstrap_results= estimate_confidence_intervals_bootstrap(Xdf,current_entity,df_metrics_locations,store,draw_number=1000, alpha=5.0)
     df_results = update_df_results(df_results,df,current_entity,homogeneity_score,df_metrics,bootstrap_results)
     print_dg_results(df_results)
 
@@ -139,6 +151,40 @@ def initiate_button_save(button_save,button_results):
     button_save.on_click(button_save_on_click)
     return button_save
 
+# Evaluate all entities
+
+def create_button_evaluate_all(button_results):
+    """
+    Creates a button evaluating all the entities in one run, so that the results table is up to date for the entities not opened in the tab 'Metrics':
+    -Removes the empty categories of all the entities, and categorizes the entities whose categories changed.
+    -Calculates the location metrics of all the entities with one read of the corpus, their metrics and their confidence intervals (see "evaluate_entities").
+    -Displays the results.
+    
+    Parameters : 
+    button_results (widgets.ToggleButton) : button that displays the entities metrics results.
+    
+    Return :
+    (widgets.Button) : button that evaluates all the entities.
+    """
+    def button_evaluate_all_on_click(b):
+        global df_results,ent_cat
+        if not path:
+            return
+        with output_results:
+            output_results.clear_output()
+            print("Evaluation of all the entities...")
+        for entity in getEnt(ent_cat):
+            ent_cat = remove_empty_categories(ent_cat,entity)
+        categorization()
+        df_results, _ = evaluate_entities(getEnt(ent_cat),ent_cat,path,df,other_categories,list_isNotFP,list_isNotFN,ban_words_entities,store,df_results,homogeneity_score,workers=ui_settings['metrics_workers'])
+        if button_results.value:
+            print_dg_results(df_results)
+        else:
+            button_results.value = True
+    button_evaluate_all = widgets.Button(description ="Evaluate all", button_style='info',icon='play',layout=widgets.Layout(width='110px'))
+    button_evaluate_all.on_click(button_evaluate_all_on_click)
+    return button_evaluate_all
+
 ######################
 # TAB 0 : LOAD FILES #
 ######################
@@ -148,7 +194,7 @@ def initiate_loading(file_path):
     Fonction that handles the event when the loading progress is triggered:
     -Retrieves the annotations (highlights) of the corpus from the selected path.
     -Initiates the following global variables from the corpus annotations (highlights) :
-        -'path','ent_cat','ban_words_entities','df','','df_tf_results','homogeneity_score','ban_words_tfidf','current_entity'.
+        -'path','ent_cat','ban_words_entities','df','','df_tf_results','homogeneity_score','ban_words_tfidf','current_entity','store'.
     -Checks if a saving files exists in the corpus directory, and change the value of the following global variables :
         -'ent_cat','list_isNotFP','list_isNotFN','ban_words_entities','df_results'
     -Updates the UI with the new global variables values. 
@@ -163,9 +209,11 @@ def initiate_loading(file_path):
     global ban_words_entities,ban_words_tfidf
     global homogeneity_score
     global list_isNotFP,list_isNotFN,df_results
+    global store
 
     # 1 - load data annotation and possible progress
-    path,ent_cat,ban_words_entities,df,df_tf_results,homogeneity_score,ban_words_tfidf,current_entity=load_data_annotations(file_path)
+    close_metrics_executor() # the workers of the previous corpus are not reused
+    path,ent_cat,ban_words_entities,df,df_tf_results,homogeneity_score,ban_words_tfidf,current_entity,store=load_data_annotations(file_path)
     var=load_json(path,df,homogeneity_score,ent_cat)
     ent_cat = var.get('ent_cat', ent_cat)
     list_isNotFP = var.get('list_isNotFP', list_isNotFP)
@@ -239,19 +287,35 @@ def create_t1_category_selection():
 def on_button_search_clicked(output_concordancer,word):
     """
     Handle the events when the button search is clicked for the concordancer:
-    -Loads the corpus
-    -Search the occurrences of the word in the corpus and saves it in a datagrid.
-    -Display the datagrid in the output 'output_concordancer'.
+    -Search the occurrences of the word in the corpus and saves the first page in a datagrid.
+    -Display the datagrid and the page navigation in the output 'output_concordancer'.
     
     Parameters : 
     output_concordancer (widgets.Output) : Output displaying the concordancer's results.
     word (string) : string containing the word or term that needs to be search in the corpus.
     """
-    docs = load_from_brat(path, merge_all_fragments=True)
-    res_concordancer = calculate_concordancer(word,current_entity,path,docs)
+    results = create_concordancer_results(word,path,store)
+    res_concordancer = calculate_concordancer(results)
+    page_label = widgets.Label()
+    button_previous = widgets.Button(description='Previous',icon='arrow-left')
+    button_next = widgets.Button(description='Next',icon='arrow-right')
+    
+    def on_page_change(page):
+        if page != results.get('page'):
+            if 'page' in results:
+                res_concordancer.data = get_concordancer_page(results,page)
+            results['page'] = page
+        first = page*results['page_size']
+        page_label.value = str(min(first+1,results['total']))+"-"+str(min(first+results['page_size'],results['total']))+" of "+str(results['total'])+" occurrences"
+        button_previous.disabled = page == 0
+        button_next.disabled = page >= get_concordancer_pages_number(results)-1
+    
+    button_previous.on_click(lambda _: on_page_change(results['page']-1))
+    button_next.on_click(lambda _: on_page_change(results['page']+1))
+    on_page_change(0)
     with output_concordancer:
         output_concordancer.clear_output()
-        display(res_concordancer)
+        display(widgets.VBox([widgets.HBox([button_previous,page_label,button_next]),res_concordancer]))
     
 def create_t1a2():
     """
@@ -356,8 +420,8 @@ def remove_ent_cat(i):
     """
     global list_isNotFP,list_isNotFN,ent_cat
     cat = getCat(current_entity,ent_cat)[i]
-    list_isNotFP = [values_notFP for values_notFP in list_isNotFP if values_notFP[0] != cat]
-    list_isNotFN = [values_notFN for values_notFN in list_isNotFN if values_notFN[0] != cat]
+    list_isNotFP = {key: value for key, value in list_isNotFP.items() if key[0] != cat}
+    list_isNotFN = {key: value for key, value in list_isNotFN.items() if key[0] != cat}
     ent_cat[current_entity].remove(ent_cat[current_entity][i])
     ent_cat = remove_empty_categories(ent_cat,current_entity)
     update_tabs()
@@ -473,7 +537,7 @@ def create_t2a1():
     t2a1_title1 = widgets.HTML(value=f"<h2 style='height: 20px; line-height: 20px; text-align: left; display: flex; align-items: center;'>{title1}</h2>")
     t2a1_title2 = widgets.HTML(value=f"<h2 style='height: 20px; line-height: 20px; text-align: left; display: flex; align-items: center;'>{title2}</h2>")
     t2a1_tags = create_categories_tags()
-    accordion_recommendations = create_accordion_recommendations(list_spacing_regex,path,current_entity,df)
+    accordion_recommendations = create_accordion_recommendations(list_spacing_regex,path,current_entity,df,store)
     
     return widgets.VBox([t2a1_title1,t2a1_texts,space,accordion_recommendations,t2a1_title2,t2a1_tags,space,button_categorization])
 
@@ -525,7 +589,7 @@ def categorization():
         -'df','current_entity','other_categories','list_spacing_regex'.
     """
     global df,current_entity,other_categories,list_spacing_regex    
-    df,other_categories,list_spacing_regex = calculate_categorization(df,ent_cat,current_entity,other_categories,list_spacing_regex)
+    df,other_categories,list_spacing_regex = calculate_categorization(df,ent_cat,current_entity,other_categories,list_spacing_regex,store)
 
 def create_t2a2():
     """
@@ -589,12 +653,18 @@ def change_visualization_metric(index, df_metrics_locations,t3_output1_entity_re
     value_isNotFN = bool(df_metrics_locations.iloc[index]['isNotFN'])
         
     # display Text + annotation + motif
-    text2=text
+    highlights = []
     if annotation != "no annotation":
-        common_string = compare_common_string(annotation, text)
-        text2 = text2.replace(common_string, f'<span style="background-color: orange; padding: 4px 0;">{common_string}</span>')
-    text2 = text2.replace(motif, f'<span style="background-color: red;">{motif}</span>') 
-    t3_output_text_highlight.value = text2
+        if motif == "no motif": # FN : the annotation is at the place of the location
+            common_places = get_context_places(places)
+        else: # TP : the part of the annotation overlapping the motif
+            common_places = find_common_string(annotation, text, get_context_places(places))
+        if common_places is not None:
+            highlights.append((common_places[0], common_places[1], "background-color: orange; padding: 4px 0;"))
+    if motif != "no motif":
+        motif_places = get_context_places(places)
+        highlights.append((motif_places[0], motif_places[1], "background-color: red;"))
+    t3_output_text_highlight.value = highlight_text(text, highlights)
         
     # Checkbox
     def on_checkBox_isNotFPorFN_clicked(change,instruction):
@@ -613,21 +683,21 @@ def change_visualization_metric(index, df_metrics_locations,t3_output1_entity_re
         
         column= 'isNotFP'
         result= ["TP(corr)","FP"]
-        bool_FNorFP_value = [True,False]
         target_list = list_isNotFP
+        target_value = motif
         if instruction=="FN":
             column= 'isNotFN'
             result= ["Discarded","FN"]
-            bool_FNorFP_value = [False,True]
             target_list = list_isNotFN
+            target_value = annotation
             
         df_metrics_locations.loc[index, column] = not df_metrics_locations.loc[index, column] 
         if df_metrics_locations.loc[index, column]:
             df_metrics_locations.loc[index, 'result'] = result[0]
-            target_list.append([category,result[0],bool_FNorFP_value[0],bool_FNorFP_value[1],text,file,places,annotation,motif])
+            add_decision(target_list,category,file,places,target_value)
         else : 
             df_metrics_locations.loc[index, 'result'] = result[1]
-            target_list.remove([category,result[0],bool_FNorFP_value[0],bool_FNorFP_value[1],text,file,places,annotation,motif])
+            remove_decision(target_list,category,file,places)
             
         dg_metrics_locations = create_grid_metrics_locations(df_metrics_locations, current_entity)
         dg_metrics_locations.observe(lambda *_: change_visualization_metric(dg_metrics_locations.selections[0]['r1'], df_metrics_locations,t3_output1_entity_results,t3_output2_metrics_results ,t3_output_text_highlight,df_metrics, container_checkBox_isNotFPorFN, output_t3_TEMP, t3_output3_metrics_locations, create_grid_metrics_locations), names='selections')
@@ -692,8 +762,8 @@ def create_t3a1():
     t3a3_title = widgets.HTML(value=f"<h2 style='height: 30px; line-height: 30px; text-align: left; display: flex; align-items: center;'>{title}</h2>")
     
     # calculation of metrics dataframes
-    metrics_locations = calculate_location_metrics(current_entity,ent_cat,path,df,other_categories,list_isNotFP,list_isNotFN,ban_words_entities)
-    df_metrics_locations = pd.DataFrame(metrics_locations[current_entity],columns=["category", "result","isNotFP","isNotFN","text","file", "places","annotation","motif"])
+    metrics_locations = calculate_location_metrics(current_entity,ent_cat,path,df,other_categories,list_isNotFP,list_isNotFN,ban_words_entities,store,workers=ui_settings['metrics_workers'])
+    df_metrics_locations = pd.DataFrame(metrics_locations[current_entity],columns=METRICS_LOCATIONS_COLUMNS)
     dg_metrics_locations = create_grid_metrics_locations(df_metrics_locations,current_entity)
     dg_metrics_locations.observe(lambda *_: change_visualization_metric(dg_metrics_locations.selections[0]['r1'], df_metrics_locations,t3_output1_entity_results, t3_output2_metrics_results ,t3_output_text_highlight,df_metrics ,container_checkBox_isNotFPorFN, output_t3_TEMP, t3_output3_metrics_locations, create_grid_metrics_locations), names='selections')
     df_metrics = calculate_df_metrics(df_metrics_locations)
@@ -752,7 +822,7 @@ def Launch_REST():
     tabs.set_title(2, 'Categorization')
     tabs.set_title(3, 'Metrics')
     button_results = create_button_results()
-    selection_results_save = widgets.HBox([button_selection_entity,button_results,initiate_button_save(button_save,button_results)])
+    selection_results_save = widgets.HBox([button_selection_entity,button_results,create_button_evaluate_all(button_results),initiate_button_save(button_save,button_results)])
     interface = widgets.VBox([space,space,selection_results_save,output_results,tabs],layout={'border': '2px solid lightblue','width':'100%'})
     on_visualization_categorie_change({'new':getCat(current_entity,ent_cat)[0]})
     display(interface)
@@ -2,7 +2,27 @@ import pandas as pd
 from ipydatagrid import DataGrid, TextRenderer, BarRenderer, Expr, VegaExpr,CellRenderer
 from bqplot import LinearScale, ColorScale, OrdinalColorScale, OrdinalScale
 import plotly.graph_objects as go
-import copy
+
+def highlight_text(text, highlights):
+    """
+    Highlight parts of a text in html, from their places in the text. The overlapping parts are nested, the first highlight being the outermost.
+    
+    Parameters : 
+    text (string) : the text.
+    highlights (list) : (beginning, end, css style) of each part to highlight.
+    
+    Return :
+    (string) : the highlighted text, in html.
+    """
+    boundaries = sorted({0, len(text)} | {min(max(place, 0), len(text)) for start, end, style in highlights for place in (start, end)})
+    parts = []
+    for begin, end in zip(boundaries, boundaries[1:]):
+        part = text[begin:end]
+        for start_highlight, end_highlight, style in reversed(highlights):
+            if start_highlight <= begin and end <= end_highlight:
+                part = f'<span style="{style}">{part}</span>'
+        parts.append(part)
+    return "".join(parts)
 
 def create_dg_results(df_results):
     if df_results.empty : 
@@ -10,11 +30,9 @@ def create_dg_results(df_results):
         dg_results = DataGrid(pd.DataFrame(columns=columns),layout={"height":"50px","width":"800px"},base_row_size=20)
         return dg_results
 
-    df_temp = copy.deepcopy(df_results)
-    df_temp.loc[:, 'precision_confidence_interval'] = df_temp.apply(lambda row: f"[{row['precision_conf_inter_down']}, {row['precision_conf_inter_up']}]",axis=1)
-    df_temp.loc[:, 'recall_confidence_interval'] = df_temp.apply(lambda row: f"[{row['recall_conf_inter_down']}, {row['recall_conf_inter_up']}]",axis=1)
-    
-    df_temp = df_temp.drop(columns=['precision_conf_inter_down', 'precision_conf_inter_up','recall_conf_inter_down', 'recall_conf_inter_up'])
+    df_temp = df_results.drop(columns=['precision_conf_inter_down', 'precision_conf_inter_up','recall_conf_inter_down', 'recall_conf_inter_up'])
+    df_temp['precision_confidence_interval'] = [f"[{down}, {up}]" for down, up in zip(df_results['precision_conf_inter_down'],df_results['precision_conf_inter_up'])]
+    df_temp['recall_confidence_interval'] = [f"[{down}, {up}]" for down, up in zip(df_results['recall_conf_inter_down'],df_results['recall_conf_inter_up'])]
     
     height= str((len(df_temp)+1)*20+5)+"px"
     columns=["entity", "homogeneity", "TP", "FP", "FN", "precision", "precision_confidence_interval", "recall","recall_confidence_interval"]
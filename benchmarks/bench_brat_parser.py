@@ -0,0 +1,76 @@
+"""
+Micro-benchmark of the .ann line parsers of "extraction/brat.py".
+
+Generates synthetic brat lines (entities with one or several fragments, attributes, relations)
+and compares the regex parsers ("match_entity_line", "match_relation_line") with the split-based
+parsers ("split_entity_line", "split_relation_line") used by "load_from_brat".
+
+Usage :
+    python benchmarks/bench_brat_parser.py [number_of_lines]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from REST_modules.extraction.brat import match_entity_line, match_relation_line, split_entity_line, split_relation_line
+
+LABELS = ["Cancer", "Tumeur", "Traitement", "Metastase", "Chirurgie"]
+WORDS = ["cancer", "du", "sein", "tumeur", "pulmonaire", "chimiothérapie", "métastases", "osseuses"]
+
+
+def generate_lines(number_of_lines, seed=0):
+    """
+    Generate synthetic .ann lines : 80% of entities (a quarter of them with two fragments) and 20% of relations.
+    """
+    rng = random.Random(seed)
+    entity_lines = []
+    relation_lines = []
+    for i in range(1, number_of_lines + 1):
+        if rng.random() < 0.8:
+            begin = rng.randint(0, 50000)
+            end = begin + rng.randint(3, 40)
+            span = f"{begin} {end}"
+            if rng.random() < 0.25:
+                span += f";{end + 1} {end + rng.randint(3, 20)}"
+            text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 4)))
+            entity_lines.append(f"T{i}\t{rng.choice(LABELS)} {span}\t{text}\n")
+        else:
+            relation_lines.append(f"R{i}\tRelation Arg1:T{rng.randint(1, i)} Arg2:T{rng.randint(1, i)}\t\n")
+    return entity_lines, relation_lines
+
+
+def time_parser(parse_entity, parse_relation, entity_lines, relation_lines, repeat=5):
+    """
+    Return the best time (in seconds) to parse all the lines with the given parsers.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for line in entity_lines:
+            parse_entity(line)
+        for line in relation_lines:
+            parse_relation(line)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(number_of_lines=200000):
+    entity_lines, relation_lines = generate_lines(number_of_lines)
+    for line in entity_lines:
+        assert split_entity_line(line) == match_entity_line(line), line
+    for line in relation_lines:
+        assert split_relation_line(line) == match_relation_line(line), line
+
+    regex_time = time_parser(match_entity_line, match_relation_line, entity_lines, relation_lines)
+    split_time = time_parser(split_entity_line, split_relation_line, entity_lines, relation_lines)
+    print(f"{number_of_lines} lines ({len(entity_lines)} entities, {len(relation_lines)} relations)")
+    print(f"regex parser : {number_of_lines / regex_time:12,.0f} lines/sec")
+    print(f"split parser : {number_of_lines / split_time:12,.0f} lines/sec")
+    print(f"speed-up     : {regex_time / split_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
@@ -0,0 +1,93 @@
+"""
+Memory benchmark of the normalisation stages of "load_data_annotations".
+
+Generates a synthetic brat corpus, then runs the extraction, stemming and Levenshtein stages in a fresh process
+for each mode, and reports the peak RSS of the process, the peak of the memory allocated by the whole load
+(parsing of the corpus, annotation store and stages) and the peak of the memory allocated by the stages alone :
+-'deepcopy' : each stage works on a deep copy of the annotations (the previous behaviour).
+-'copy-on-write' : the stages only copy the dictionnaries they modify ("inplace=False").
+-'inplace' : the stages update the annotations ("inplace=True"), as "load_data_annotations" does.
+
+Usage :
+    python benchmarks/bench_load_memory.py [number_of_documents]
+"""
+import copy
+import multiprocessing
+import os
+import random
+import resource
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+LABELS = ["Cancer", "Tumeur", "Traitement", "Metastase"]
+WORDS = ["cancer", "du", "sein", "tumeur", "pulmonaire", "chimiothérapie", "métastases", "osseuses",
+         "adénocarcinome", "carcinome", "canalaire", "infiltrant", "lobulaire", "grade", "stade", "récidive"]
+MODES = ["deepcopy", "copy-on-write", "inplace"]
+
+
+def generate_corpus(path, number_of_documents, seed=0):
+    """
+    Generate a synthetic brat corpus : each document is a .txt file of 300 words and a .ann file annotating a third of them.
+    """
+    rng = random.Random(seed)
+    for i in range(number_of_documents):
+        words = [rng.choice(WORDS) + rng.choice(["", "s", "x", "e"]) for _ in range(300)]
+        text = " ".join(words)
+        lines = []
+        begin = 0
+        for j, word in enumerate(words):
+            if j % 3 == 0:
+                length = rng.randint(1, 3)
+                mention = " ".join(words[j:j + length])
+                lines.append(f"T{len(lines) + 1}\t{rng.choice(LABELS)} {begin} {begin + len(mention)}\t{mention}\n")
+            begin += len(word) + 1
+        with open(os.path.join(path, f"doc{i}.txt"), "w", encoding="utf-8") as file:
+            file.write(text)
+        with open(os.path.join(path, f"doc{i}.ann"), "w", encoding="utf-8") as file:
+            file.write("".join(lines))
+
+
+def run_stages(path, mode, queue):
+    """
+    Load the corpus and run the normalisation stages in the given mode, and send the peak RSS, the peak of the memory allocated by the whole load
+    and the peak of the memory allocated by the stages (in MB).
+    """
+    from REST_modules.extraction import load_from_brat, build_annotation_store, extract_annotations, stemming, Levenshtein, createData
+
+    tracemalloc.start()
+    store = build_annotation_store(load_from_brat(path, merge_all_fragments=True, workers=1))
+    _, peak_load = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    annotations = extract_annotations(store, need_translation=False)
+    if mode == "deepcopy":
+        annotations = stemming(copy.deepcopy(annotations))
+        annotations, _ = Levenshtein(copy.deepcopy(annotations), 3)
+    else:
+        inplace = mode == "inplace"
+        annotations = stemming(annotations, inplace=inplace)
+        annotations, _ = Levenshtein(annotations, 3, inplace=inplace)
+    createData(annotations)
+    _, peak_stages = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    queue.put((resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, max(peak_load, peak_stages) / 1024 ** 2, peak_stages / 1024 ** 2))
+
+
+def main(number_of_documents=500):
+    with tempfile.TemporaryDirectory() as path:
+        generate_corpus(path, number_of_documents)
+        print(f"{number_of_documents} documents")
+        context = multiprocessing.get_context("spawn")
+        for mode in MODES:
+            queue = context.Queue()
+            process = context.Process(target=run_stages, args=(path, mode, queue))
+            process.start()
+            peak_rss, peak_load, peak_stages = queue.get()
+            process.join()
+            print(f"{mode:14}: peak RSS {peak_rss:8.1f} MB, peak allocated by the load {peak_load:8.1f} MB, by the stages {peak_stages:8.1f} MB")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
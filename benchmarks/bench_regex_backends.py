@@ -0,0 +1,75 @@
+"""
+Benchmark of the regex backends of "calculs/regex.py".
+
+Generates categories of several hundred synonyms (each with its plural form) sharing prefixes, and a synthetic corpus.
+Compiles the categories with the "flat" backend ("a|b|c|...") and the "trie" backend (common prefixes of consecutive
+literal words merged), checks that both find the same matches, and compares the search times.
+
+Usage :
+    python benchmarks/bench_regex_backends.py [number_of_synonyms]
+"""
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from REST_modules.calculs.regex import generate_regex
+
+PREFIXES = ["carcino", "adéno", "métasta", "chimio", "radio", "lympho", "néo", "tumor", "hépato", "cyto"]
+SUFFIXES = ["me", "se", "tique", "thérapie", "logie", "pathie", "gène", "cyte", "lyse", "plasie", "sarcome", "blastome"]
+WORDS = ["le", "la", "du", "de", "patient", "présente", "un", "une", "avec", "sans", "traitement", "par", "et", "primitif", "secondaire"]
+
+
+def generate_category(number_of_synonyms, seed=0):
+    """
+    Generate a category of synonyms, each one followed by its plural form, and a category "<synonyms> + <words>".
+    """
+    rng = random.Random(seed)
+    synonyms = []
+    while len(synonyms) < 2 * number_of_synonyms:
+        word = rng.choice(PREFIXES) + rng.choice(SUFFIXES) + rng.choice(["", "s", "ique", "iques"])
+        if word not in synonyms:
+            synonyms.extend([word, word + "s"])
+    return synonyms, synonyms + ["+", "primitif", "secondaire", "+?", "du", "de"]
+
+
+def generate_texts(synonyms, number_of_texts=200, seed=0):
+    """
+    Generate texts of 500 words, 10% of them being synonyms of the category.
+    """
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(synonyms) if rng.random() < 0.1 else rng.choice(WORDS) for _ in range(500)) for _ in range(number_of_texts)]
+
+
+def time_regex(regex, texts, repeat=3):
+    """
+    Return the best time (in seconds) to find all the matches of the regex in the texts, and the matches.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        matches = [[match.span() for match in re.finditer(regex, text)] for text in texts]
+        best = min(best, time.perf_counter() - start)
+    return best, matches
+
+
+def main(number_of_synonyms=300):
+    synonyms, words = generate_category(number_of_synonyms)
+    texts = generate_texts(synonyms)
+    for name, category in [("synonyms", synonyms), ("synonyms + connectors", words)]:
+        flat_regex = generate_regex(category, backend="flat")[0]
+        trie_regex = generate_regex(category, backend="trie")[0]
+        flat_time, flat_matches = time_regex(flat_regex, texts)
+        trie_time, trie_matches = time_regex(trie_regex, texts)
+        assert flat_matches == trie_matches
+        print(f"{name} ({len(category)} words, {sum(map(len, flat_matches))} matches)")
+        print(f"flat : {flat_time * 1000:8.1f} ms, pattern of {len(flat_regex.pattern)} characters")
+        print(f"trie : {trie_time * 1000:8.1f} ms, pattern of {len(trie_regex.pattern)} characters")
+        print(f"speed-up : {flat_time / trie_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 300)